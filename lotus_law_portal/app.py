@@ -1,28 +1,133 @@
-from datetime import datetime
+from datetime import date, datetime
 from dateutil.parser import parse as dateparse
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, session
+from flask import (Flask, Response, abort, g, has_request_context, render_template, request, redirect, url_for,
+                   flash, send_file, send_from_directory, session, stream_with_context)
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FsaSession
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+import numpy as np
 import pandas as pd
+import functools
+from contextlib import contextmanager
 import io
+import math
+import click
 from flask_migrate import Migrate
 import pytz
 from werkzeug.utils import secure_filename
+import gzip
+import hashlib
+import mimetypes
 import os
+import re
+import secrets
+import sqlite3
 import tempfile
-from sqlalchemy import or_, func
+import threading
+import time
+import zlib
+from sqlalchemy import or_, func, text, event, case, select, insert, update, delete, inspect as sa_inspect
+from sqlalchemy import types as sqltypes
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session as SASession, contains_eager, defer
+from sqlalchemy.exc import IntegrityError
+
+from workbook import read_workbook
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib json encoder
+    orjson = None
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: Parquet/Arrow exports are unavailable
+    pa = pq = None
+try:
+    import fcntl
+except ImportError:  # Windows: waitress runs a single process, no lock needed
+    fcntl = None
+try:
+    import brotli
+except ImportError:  # optional: responses are gzip-compressed only
+    brotli = None
 
 app = Flask(__name__)
-app.secret_key = "change-this-secret-key"
+# Without SECRET_KEY (development only) a random key is used, so sessions end on restart
+app.secret_key = os.environ.get("SECRET_KEY") or secrets.token_hex(32)
 
 # Database
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///data.db"
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///data.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db = SQLAlchemy(app)
+# Pooled connections are shared by the server's worker threads; the busy timeout
+# lets a writer wait for another thread's transaction instead of failing at once.
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_pre_ping": True,
+    "connect_args": {"check_same_thread": False, "timeout": 30}
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite") else {},
+}
+# Reporting reads (dashboard, exports, reconciliation) can run on a separate "reporting" bind:
+# a replica given by REPORTING_DATABASE_URL, or with REPORTING_SNAPSHOT=1 a SQLite copy of the
+# primary refreshed through the backup API once it is older than REPORTING_MAX_STALENESS seconds.
+REPORTING_SNAPSHOT_PATH = os.path.join(app.instance_path, "reporting.db")
+REPORTING_MAX_STALENESS = float(os.environ.get("REPORTING_MAX_STALENESS", "60"))
+if os.environ.get("REPORTING_DATABASE_URL"):
+    app.config["SQLALCHEMY_BINDS"] = {"reporting": os.environ["REPORTING_DATABASE_URL"]}
+elif os.environ.get("REPORTING_SNAPSHOT") == "1" and app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+    app.config["SQLALCHEMY_BINDS"] = {"reporting": f"sqlite:///{REPORTING_SNAPSHOT_PATH}"}
+# Large bill/receipt workbooks go through the import routes
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_UPLOAD_MB", "50")) * 1024 * 1024
+
+
+class RoutingSession(FsaSession):
+    # Inside reporting routes reads go to the reporting bind; flushes always go to the primary
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get("reporting"):
+            return db.engines["reporting"]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(app, session_options={"class_": RoutingSession})
 migrate = Migrate(app, db)
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    # Same behaviour as Flask's provider, several times faster on large API pages
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj, default=self.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_pragmas(dbapi_conn, _record):
+    # WAL lets report reads run alongside data entry writes from other threads/workers
+    if not isinstance(dbapi_conn, sqlite3.Connection):
+        return
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA busy_timeout=30000")
+    cur.close()
+
 # Ensure instance/tmp directory exists for temp uploads
 os.makedirs(os.path.join(app.instance_path, "tmp"), exist_ok=True)
 
+# Compiled templates are kept on disk, so new workers skip Jinja compilation
+os.makedirs(os.path.join(app.instance_path, "jinja_cache"), exist_ok=True)
+app.jinja_options = {
+    **app.jinja_options,
+    "bytecode_cache": FileSystemBytecodeCache(os.path.join(app.instance_path, "jinja_cache")),
+}
+
 # ---------- Models ----------
 class Bill(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -56,6 +161,54 @@ class Client(db.Model):
     pan_no = db.Column(db.String(500))
     remarks = db.Column(db.Text)
 
+# Frozen month-by-client aggregates for closed financial periods
+class ClosedPeriod(db.Model):
+    period = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    closed_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    # Receipt dates of the month's bills when it was closed; the snapshot only answers
+    # queries whose receipt range takes in all of them
+    first_receipt = db.Column(db.Date)
+    last_receipt = db.Column(db.Date)
+
+class PeriodSnapshot(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(7), nullable=False, index=True)
+    client_id = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(10), nullable=False)
+    bill_count = db.Column(db.Integer, nullable=False, default=0)
+    billed = db.Column(db.Float, nullable=False, default=0.0)
+    collected = db.Column(db.Float, nullable=False, default=0.0)
+    tds = db.Column(db.Float, nullable=False, default=0.0)
+    balance = db.Column(db.Float, nullable=False, default=0.0)
+    __table_args__ = (db.UniqueConstraint("period", "client_id", "status"),)
+
+# Import registry: every processed upload, and the last imported version of each row
+class ImportedFile(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # ledger / clients / bills / receipts
+    content_hash = db.Column(db.String(64), nullable=False)
+    filename = db.Column(db.String(255))
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    imported_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    __table_args__ = (db.UniqueConstraint("kind", "content_hash"),)
+
+# Bumped whenever a table's rows change; keys the rendered-fragment cache across workers
+class DataVersion(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class ImportedRow(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    row_key = db.Column(db.String(255), nullable=False)  # Bill No, or lower-cased client name
+    fingerprint = db.Column(db.String(16), nullable=False)
+    __table_args__ = (db.UniqueConstraint("kind", "row_key"),)
+
+# Row keys each registered file contained, so deleting a record only forgets the uploads holding it
+class ImportedFileRow(db.Model):
+    file_id = db.Column(db.Integer, db.ForeignKey("imported_file.id"), primary_key=True)
+    row_key = db.Column(db.String(255), primary_key=True)
+
 # ---------- Utilities ----------
 def parse_date(s, default=None):
     if not s:
@@ -65,19 +218,250 @@ def parse_date(s, default=None):
     except Exception:
         return default
 
+def parse_iso_date(s, default=None):
+    # ISO 8601 first: JSON clients and <input type="date"> send YYYY-MM-DD, which
+    # day-first parsing would read as YYYY-DD-MM. Other strings go through parse_date.
+    if not s:
+        return default
+    s = str(s).strip()
+    try:
+        return date.fromisoformat(s)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(s).date()
+    except ValueError:
+        return parse_date(s, default)
+
 ALLOWED_IMPORT_EXTS = {".csv", ".xlsx", ".xls"}
 
-def _read_tabular(path: str) -> pd.DataFrame:
+# Formats tried when detecting an imported date column; day-first like parse_date
+IMPORT_DATE_FORMATS = [
+    "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%Y-%m-%d",
+    "%d-%m-%y", "%d/%m/%y", "%d-%b-%Y", "%d %b %Y", "%d-%B-%Y", "%d %B %Y",
+    "%Y-%m-%d %H:%M:%S", "%d-%m-%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S",
+]
+DATE_SAMPLE_SIZE = 200
+
+def _infer_date_format(sample: pd.Series):
+    best, best_hits = None, 0
+    for fmt in IMPORT_DATE_FORMATS:
+        hits = int(pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum())
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+            if hits == len(sample):
+                break
+    return best
+
+def parse_date_column(values: pd.Series, required: bool = False):
+    """Parse a whole imported date column at once.
+
+    Detects the column's format from a sample, parses every cell with one
+    vectorised to_datetime call and retries only the misses with parse_date.
+    Returns (dates, bad) where dates holds datetime.date or None per row and
+    bad lists the index labels of cells that could not be read (including
+    empty cells when the column is required).
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values
+        bad_mask = parsed.isna() if required else pd.Series(False, index=values.index)
+    else:
+        cells = values.astype("string").str.strip()
+        blank = cells.isna() | cells.str.lower().isin(["", "nan", "nat", "none"])
+        cells = cells.mask(blank)
+        fmt = _infer_date_format(cells.dropna().head(DATE_SAMPLE_SIZE))
+        if fmt:
+            parsed = pd.to_datetime(cells, format=fmt, errors="coerce")
+        else:
+            parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+        # Misses: real date cells in a mixed Excel column, then ISO text, then dateutil
+        retry = parsed.isna() & ~blank
+        native = retry & values.map(lambda v: isinstance(v, (date, datetime)))
+        if native.any():
+            parsed.loc[native] = pd.to_datetime(values[native].astype(object), errors="coerce")
+            retry &= ~native
+        if retry.any():
+            parsed.loc[retry] = pd.to_datetime(cells[retry], format="ISO8601", errors="coerce")
+            retry &= parsed.isna()
+        if retry.any():
+            parsed.loc[retry] = pd.to_datetime(
+                cells[retry].map(lambda s: parse_date(s)), errors="coerce")
+        bad_mask = parsed.isna() if required else parsed.isna() & ~blank
+    dates = parsed.dt.date.astype(object).where(parsed.notna(), None)
+    return dates, list(values.index[bad_mask])
+
+def _row_label(idx) -> str:
+    # Spreadsheet row number (header is row 1); (sheet, row) for multi-sheet workbooks
+    if isinstance(idx, tuple):
+        sheet, row = idx
+        return f"'{sheet}' row {row + 2}"
+    return f"row {idx + 2}"
+
+def _cell_amount(row, column: str) -> float:
+    # Blank spreadsheet cells arrive as NaN, which is truthy; treat them as zero
+    v = row.get(column)
+    return 0.0 if v is None or pd.isna(v) or str(v).strip() == "" else float(v)
+
+def _cell_text(row, column: str) -> str:
+    # Same for text: a blank cell, or a column only other sheets have, must not become "nan"
+    v = row.get(column)
+    return "" if v is None or pd.isna(v) else str(v).strip()
+
+def _sheet_columns(sheets: dict, df: pd.DataFrame, idx):
+    # Columns of the sheet a row came from; after a merge, df also has the other sheets' columns
+    return sheets[idx[0]].columns if isinstance(df.index, pd.MultiIndex) else df.columns
+
+def _flash_bad_dates(df: pd.DataFrame, column: str, bad: list, limit: int = 10, outcome: str = "Skipped"):
+    if not bad:
+        return
+    def _cell(i):
+        v = df.at[i, column]
+        return "blank" if pd.isna(v) or str(v).strip() == "" else v
+    shown = ", ".join(f"{_row_label(i)} ({_cell(i)})" for i in bad[:limit])
+    more = f" and {len(bad) - limit} more" if len(bad) > limit else ""
+    flash(f"{outcome} {len(bad)} row(s) with unreadable {column}: {shown}{more}.", "warning")
+
+IMPORT_PREVIEW_ROWS = 10
+IMPORT_CACHE_DAYS = 7  # parsed uploads are kept this long for repeat uploads
+
+def _read_tabular(path: str, nrows: int | None = None) -> dict[str, pd.DataFrame]:
+    # {sheet name: frame}; a CSV is a single unnamed sheet
     lp = path.lower()
     if lp.endswith(".csv"):
-        return pd.read_csv(path)
+        return {"": pd.read_csv(path, nrows=nrows)}
     if lp.endswith(".xlsx") or lp.endswith(".xls"):
-        return pd.read_excel(path)
+        return read_workbook(path, nrows=nrows)
     raise ValueError("Unsupported file type")
 
+def _import_tmp_dir() -> str:
+    tmp_dir = os.path.join(app.instance_path, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    return tmp_dir
+
+def _upload_path(digest: str, ext: str) -> str:
+    # Cached uploads are named <sha256><ext> inside the tmp dir. The digest comes back
+    # from the session on confirm, so it is checked before it becomes a path.
+    if not isinstance(digest, str) or not re.fullmatch(r"[0-9a-f]{64}", digest) \
+            or ext not in ALLOWED_IMPORT_EXTS | {".pkl"}:
+        raise ValueError("Invalid upload reference")
+    tmp_dir = os.path.realpath(_import_tmp_dir())
+    path = os.path.realpath(os.path.join(tmp_dir, digest + ext))
+    if os.path.dirname(path) != tmp_dir:
+        raise ValueError("Invalid upload reference")
+    return path
+
+def _save_upload(file, ext: str):
+    # Uploads are stored by content hash, so the same workbook maps to the same files
+    data = file.read()
+    digest = hashlib.sha256(data).hexdigest()
+    path = _upload_path(digest, ext)
+    if not os.path.exists(path):
+        fd, tmp_path = tempfile.mkstemp(dir=_import_tmp_dir(), suffix=ext)
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.replace(tmp_path, path)
+    return path, digest
+
+def _parsed_cache_path(digest: str) -> str:
+    return _upload_path(digest, ".pkl")
+
+def _load_tabular(path: str, digest: str) -> dict[str, pd.DataFrame]:
+    # Full parse happens once per distinct file; later loads read the pickled sheets
+    cache = _parsed_cache_path(digest)
+    if os.path.exists(cache):
+        try:
+            sheets = pd.read_pickle(cache)
+            return sheets if isinstance(sheets, dict) else {"": sheets}
+        except Exception:
+            pass
+    sheets = _read_tabular(path)
+    fd, tmp_path = tempfile.mkstemp(dir=_import_tmp_dir(), suffix=".pkl")
+    os.close(fd)
+    pd.to_pickle(sheets, tmp_path)
+    os.replace(tmp_path, cache)
+    return sheets
+
+def _preview_tabular(path: str, digest: str) -> pd.DataFrame:
+    cache = _parsed_cache_path(digest)
+    if os.path.exists(cache):
+        sheets = {name: frame.head(IMPORT_PREVIEW_ROWS) for name, frame in _load_tabular(path, digest).items()}
+    else:
+        sheets = _read_tabular(path, nrows=IMPORT_PREVIEW_ROWS)
+    if len(sheets) == 1:
+        return next(iter(sheets.values()))
+    return pd.concat([frame.assign(Sheet=name)[["Sheet", *frame.columns]] for name, frame in sheets.items()],
+                     ignore_index=True)
+
+def _merge_sheets(sheets: dict[str, pd.DataFrame], required: list[str]):
+    # Validate each sheet on its own and stack the usable ones. Multi-sheet rows are
+    # indexed (sheet, row) so problems can be reported against the right sheet.
+    good, skipped = {}, []
+    for name, frame in sheets.items():
+        frame = frame.dropna(how="all")
+        missing = _required_missing(frame, required)
+        if frame.empty:
+            skipped.append((name, "no rows"))
+        elif missing:
+            skipped.append((name, f"missing columns: {', '.join(missing)}"))
+        else:
+            good[name] = frame
+    if not good:
+        return None, skipped
+    if len(sheets) == 1:
+        return next(iter(good.values())), skipped
+    return pd.concat(good, names=["sheet", "row"]), skipped
+
+def _flash_unusable(skipped: list):
+    if len(skipped) == 1:
+        why = skipped[0][1]
+        flash(why[:1].upper() + why[1:], "danger")
+    else:
+        flash("No sheet could be imported: " + "; ".join(f"'{name}' ({why})" for name, why in skipped) + ".", "danger")
+
+def _flash_sheets(sheets: dict, skipped: list, processed: list | None = None):
+    if len(sheets) < 2:
+        return
+    if skipped:
+        flash("Skipped sheets: " + "; ".join(f"'{name}' ({why})" for name, why in skipped) + ".", "warning")
+    if processed is not None:
+        per_sheet = pd.Series([idx[0] for idx in processed], dtype=object).value_counts()
+        flash("Rows imported per sheet: " + ", ".join(
+            f"'{name}' {int(per_sheet.get(name, 0))}" for name in sheets
+            if name not in dict(skipped)) + ".", "info")
+
+def _discard_upload(path: str):
+    # The raw file is no longer needed once parsed; the pickled frame stays cached
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _prune_import_cache():
+    cutoff = time.time() - IMPORT_CACHE_DAYS * 86400
+    for name in os.listdir(_import_tmp_dir()):
+        path = os.path.join(_import_tmp_dir(), name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
 def _required_missing(df: pd.DataFrame, required_cols: list[str]) -> list[str]:
     return [c for c in required_cols if c not in df.columns]
 
+IN_CHUNK = 500  # stay well under SQLite's bound-parameter limit
+
+def _chunks(values: list, size: int = IN_CHUNK):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def _existing(column, values):
+    # One IN query per chunk instead of one lookup per item
+    found = set()
+    for chunk in _chunks(list({v for v in values if v})):
+        found.update(v for (v,) in db.session.query(column).filter(column.in_(chunk)))
+    return found
+
 
 # All Bills: search only Bill No or Client name
 def apply_bill_search(query, q):
@@ -117,12 +501,323 @@ def build_pagination(total, page, per_page, url_builder):
         "start_idx": 0 if total == 0 else (page - 1) * per_page + 1,
         "end_idx": 0 if total == 0 else min(page * per_page, total),
     }
-    
+
+# ---------- Render cache ----------
+# Client/bill pickers only change with their tables, so each is rendered once per data version.
+TEXT_PREVIEW_CHARS = 25
+PAGE_WINDOW = 2
+_fragments: dict = {}
+
+@event.listens_for(SASession, "after_flush")
+def _bump_data_versions(session, _flush_ctx):
+    changed = {obj.__tablename__ for obj in list(session.new) + list(session.deleted) if isinstance(obj, (Client, Bill))}
+    changed |= {obj.__tablename__ for obj in session.dirty
+                if isinstance(obj, (Client, Bill)) and session.is_modified(obj, include_collections=False)}
+    conn = session.connection()
+    for name in changed:
+        bumped = conn.execute(update(DataVersion).where(DataVersion.name == name)
+                              .values(version=DataVersion.version + 1))
+        if not bumped.rowcount:
+            conn.execute(insert(DataVersion).values(name=name, version=1))
+
+def _data_versions() -> dict:
+    return dict(db.session.query(DataVersion.name, DataVersion.version))
+
+def _fragment(template: str, tables: tuple, versions: dict, load, **ctx):
+    # load() is only called on a miss; ctx vars are part of the cache key
+    key = (template, tuple(sorted(ctx.items())))
+    version = tuple(versions.get(t, 0) for t in tables)
+    hit = _fragments.get(key)
+    if hit and hit[0] == version:
+        return hit[1]
+    html = Markup(render_template(template, **load(), **ctx))
+    _fragments[key] = (version, html)
+    return html
+
+def _client_options(versions: dict, prefix: str):
+    return _fragment("_client_options.html", ("client",), versions,
+                     lambda: {"clients": Client.query.order_by(Client.name.asc()).all()}, prefix=prefix)
+
+def _bill_options(versions: dict):
+    return _fragment("_bill_options.html", ("bill",), versions,
+                     lambda: {"bill_nos": [b for (b,) in db.session.query(Bill.bill_no).order_by(Bill.bill_no.asc())]})
+
+def _text_head(column):
+    # One character past the preview is enough to know whether to offer the full text
+    return func.substr(column, 1, TEXT_PREVIEW_CHARS + 1)
+
+@app.template_global()
+def page_window(pagination):
+    # First, last and the pages around the current one; None marks a gap
+    page, pages = pagination["page"], pagination["pages"]
+    shown = sorted({1, pages, *range(max(1, page - PAGE_WINDOW), min(pages, page + PAGE_WINDOW) + 1)})
+    out, prev = [], 0
+    for p in shown:
+        if p - prev > 1:
+            out.append(None)
+        out.append(p)
+        prev = p
+    return out
+
+app.add_template_global(TEXT_PREVIEW_CHARS, "TEXT_PREVIEW_CHARS")
+
+# ---------- HTTP compression and static caching ----------
+# Dynamic responses are compressed chunk by chunk, so streamed exports and NDJSON
+# keep streaming; static files are served from precompressed siblings when present.
+COMPRESSIBLE_TYPES = {"text/html", "text/csv", "text/css", "text/plain", "application/json",
+                      "application/x-ndjson", "application/javascript", "image/svg+xml"}
+COMPRESS_MIN_BYTES = 500
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", "6"))
+COMPRESS_FLUSH_BYTES = 32 * 1024
+COMPRESS_FLUSH_SECONDS = 1.0
+STATIC_MAX_AGE = 365 * 24 * 3600
+PRECOMPRESSED = {"br": ".br", "gzip": ".gz"}
+_static_versions: dict = {}
+
+def _encodings() -> list[str]:
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        comp = brotli.Compressor(quality=min(COMPRESS_LEVEL, 11))
+        return comp.process, comp.flush, comp.finish
+    comp = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip container
+    return comp.compress, lambda: comp.flush(zlib.Z_SYNC_FLUSH), comp.flush
+
+def _compress_stream(chunks, encoding: str, source):
+    # Flushing ends a compression block, so only flush every COMPRESS_FLUSH_BYTES of input,
+    # or once a slow producer has kept output waiting for COMPRESS_FLUSH_SECONDS
+    compress, flush, finish = _compressor(encoding)
+    pending, last_flush = 0, time.monotonic()
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            out = compress(chunk)
+            pending += len(chunk)
+            now = time.monotonic()
+            if pending >= COMPRESS_FLUSH_BYTES or now - last_flush >= COMPRESS_FLUSH_SECONDS:
+                out += flush()
+                pending, last_flush = 0, now
+            if out:
+                yield out
+        yield finish()
+    finally:
+        if hasattr(source, "close"):
+            source.close()
+
+@app.after_request
+def _compress_response(response):
+    if (request.endpoint == "static" or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(_encodings())
+    if not encoding:
+        return response
+    if response.is_streamed or response.direct_passthrough:
+        source = response.response
+        response.response = _compress_stream(response.iter_encoded(), encoding, source)
+        response.direct_passthrough = False
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_BYTES:
+            return response
+        compress, _, finish = _compressor(encoding)
+        response.set_data(compress(body) + finish())
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+def _static_version(filename: str):
+    # Content fingerprint, recomputed only when the file changes on disk
+    path = os.path.join(app.static_folder, filename)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _static_versions.get(filename)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as f:
+        version = hashlib.md5(f.read()).hexdigest()[:12]
+    _static_versions[filename] = (mtime, version)
+    return version
+
+@app.url_defaults
+def _fingerprint_static(endpoint, values):
+    if endpoint == "static" and "v" not in values:
+        version = _static_version(values.get("filename", ""))
+        if version:
+            values["v"] = version
+
+def _send_static(filename):
+    # Fingerprinted URLs never change content, so browsers may keep them for a year
+    fingerprinted = bool(request.args.get("v"))
+    max_age = STATIC_MAX_AGE if fingerprinted else None
+    source = os.path.join(app.static_folder, filename)
+    encoding = request.accept_encodings.best_match([e for e in _encodings() if e in PRECOMPRESSED])
+    variant = source + PRECOMPRESSED[encoding] if encoding else None
+    if (variant and os.path.isfile(source) and os.path.isfile(variant)
+            and os.path.getmtime(variant) >= os.path.getmtime(source)):
+        response = send_from_directory(app.static_folder, filename + PRECOMPRESSED[encoding],
+                                       mimetype=mimetypes.guess_type(filename)[0], max_age=max_age)
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response = send_from_directory(app.static_folder, filename, max_age=max_age)
+    response.vary.add("Accept-Encoding")
+    if fingerprinted:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    return response
+
+app.view_functions["static"] = _send_static
+
+@app.cli.command("compress-static")
+def compress_static_command():
+    """Write .gz (and .br when brotli is installed) next to each compressible static file."""
+    written = 0
+    for root, _dirs, files in os.walk(app.static_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith((".gz", ".br")) or mimetypes.guess_type(name)[0] not in COMPRESSIBLE_TYPES:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            variants = {".gz": gzip.compress(data, 9, mtime=0)}
+            if brotli is not None:
+                variants[".br"] = brotli.compress(data, quality=11)
+            for ext, packed in variants.items():
+                if len(packed) < len(data):
+                    with open(path + ext, "wb") as f:
+                        f.write(packed)
+                    written += 1
+    click.echo(f"Wrote {written} precompressed files under {app.static_folder}")
+
+# ---------- Reporting bind ----------
+_snapshot_lock = threading.Lock()
+_refresh_start_lock = threading.Lock()
+_refresh_thread = None
+
+@contextmanager
+def _file_lock(path: str, blocking: bool = True):
+    # Lock shared by all gunicorn workers; yields False when not blocking and another holds it
+    with open(path, "a") as f:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _snapshot_taken() -> float:
+    # The stamp file is touched after each completed backup, so every worker sees the same age
+    try:
+        return os.path.getmtime(REPORTING_SNAPSHOT_PATH + ".stamp")
+    except OSError:
+        return 0.0
+
+def refresh_reporting_snapshot(force: bool = False) -> bool:
+    # Readers of the old snapshot keep their view until the copy commits
+    def fresh():
+        return _snapshot_taken() >= time.time() - REPORTING_MAX_STALENESS
+    if not force and fresh():
+        return False
+    # Only wait for a refresh already under way when the current copy cannot be served
+    wait = force or not os.path.exists(REPORTING_SNAPSHOT_PATH)
+    with _snapshot_lock, _file_lock(REPORTING_SNAPSHOT_PATH + ".lock", blocking=wait) as held:
+        if not held:
+            return False  # another worker is refreshing; keep serving the current copy
+        if not force and fresh():
+            return False  # another thread or worker refreshed it while we waited
+        started = time.perf_counter()
+        taken = time.time()  # writes committed after this may be missing from the copy
+        dst = sqlite3.connect(REPORTING_SNAPSHOT_PATH, timeout=30)
+        try:
+            with db.engine.connect() as conn:
+                conn.connection.driver_connection.backup(dst)
+        finally:
+            dst.close()
+        with open(REPORTING_SNAPSHOT_PATH + ".stamp", "w") as f:
+            f.write(datetime.fromtimestamp(taken).isoformat())
+        os.utime(REPORTING_SNAPSHOT_PATH + ".stamp", (taken, taken))
+    app.logger.info("Reporting snapshot refreshed in %.2fs", time.perf_counter() - started)
+    return True
+
+def _refresh_snapshot_in_background():
+    # One copy at a time per worker, off the request thread
+    global _refresh_thread
+    with _refresh_start_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return
+        def run():
+            with app.app_context():
+                try:
+                    refresh_reporting_snapshot()
+                except Exception:
+                    app.logger.exception("Reporting snapshot refresh failed")
+        _refresh_thread = threading.Thread(target=run, name="reporting-snapshot", daemon=True)
+        _refresh_thread.start()
+
+def _snapshot_usable(last_write: float) -> bool:
+    # A report never waits for a copy: a stale snapshot is refreshed in the background,
+    # and until then, or when it predates this browser's last write, the primary answers.
+    taken = _snapshot_taken()
+    if taken < time.time() - REPORTING_MAX_STALENESS:
+        _refresh_snapshot_in_background()
+        return False
+    return taken >= last_write
+
+@event.listens_for(SASession, "after_flush")
+def _note_write(_session, _flush_ctx):
+    if has_request_context():
+        g.wrote = True
+
+@app.after_request
+def _remember_write(response):
+    # Lets this browser's next report see its own changes despite the staleness bound
+    if g.get("wrote"):
+        session["last_write"] = time.time()
+    return response
+
+def reporting_read(view):
+    # Marks a read-only view whose queries may run on the reporting bind
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        binds = app.config.get("SQLALCHEMY_BINDS", {})
+        if "reporting" in binds:
+            g.reporting = (binds["reporting"] != f"sqlite:///{REPORTING_SNAPSHOT_PATH}"
+                           or _snapshot_usable(session.get("last_write", 0.0)))
+        return view(*args, **kwargs)
+    return wrapper
+
 # ---------- Root ----------
 @app.route("/")
 def index():
     return redirect(url_for("dashboard"))
 
+# ---------- Health ----------
+@app.get("/healthz")
+def healthz():
+    # Liveness: the worker is up and answering
+    return {"status": "ok", "pid": os.getpid()}
+
+@app.get("/readyz")
+def readyz():
+    # Readiness: the worker can reach the database
+    try:
+        db.session.execute(text("SELECT 1"))
+    except Exception as e:
+        db.session.rollback()
+        return {"status": "unavailable", "error": str(e)}, 503
+    return {"status": "ready", "pid": os.getpid()}
+
 # ---------- Clients ----------
 @app.route("/clients", methods=["GET"])
 def list_clients():
@@ -176,7 +871,6 @@ def edit_client(cid):
 # ---------- Bills ----------
 @app.route("/bills", methods=["GET", "POST"])
 def bills():
-    clients = Client.query.order_by(Client.name.asc()).all()
     if request.method == "POST":
         bill_no = request.form.get("bill_no", "").strip()
         bill_date_str = request.form.get("bill_date")
@@ -191,7 +885,7 @@ def bills():
         elif Bill.query.filter_by(bill_no=bill_no).first():
             flash("Bill No already exists.", "danger")
         else:
-            bill_date = parse_date(bill_date_str)
+            bill_date = parse_iso_date(bill_date_str)
             db.session.add(Bill(
                 bill_no=bill_no, bill_date=bill_date, client_id=int(client_id),
                 amount=amount, description=description, remarks=remarks, Subject=Subject
@@ -206,7 +900,10 @@ def bills():
     per_page = request.args.get("per_page", 15, type=int)
 
     # JOIN Client once so Client.name filters are valid (and no cross join) [JOIN HERE]
-    base_q = Bill.query.join(Client).order_by(Bill.bill_date.desc(), Bill.id.desc())
+    # Long notes stay in the database; only a preview of each is loaded
+    base_q = (db.session.query(Bill, _text_head(Bill.description), _text_head(Bill.remarks))
+              .join(Client).options(contains_eager(Bill.client), defer(Bill.description), defer(Bill.remarks))
+              .order_by(Bill.bill_date.desc(), Bill.id.desc()))
     filt_q = apply_bill_search(base_q, qtext)
 
     total = filt_q.count()
@@ -217,7 +914,7 @@ def bills():
 
     pagination = build_pagination(total, page, per_page, _url)
     return render_template("bills.html",
-                        bills=items, clients=Client.query.order_by(Client.name.asc()).all(),
+                        bills=items, client_options=_client_options(_data_versions(), "bill-client-opt"),
                         pagination=pagination, qtext=qtext)
 
 
@@ -234,7 +931,7 @@ def edit_bill(bid):
             flash("Bill No already exists.", "danger")
             return redirect(request.url)
         b.bill_no = new_bill_no
-        b.bill_date = parse_date(request.form.get("bill_date"))
+        b.bill_date = parse_iso_date(request.form.get("bill_date"))
         b.client_id = int(request.form.get("client_id"))
         b.amount = float(request.form.get("amount") or 0)
         b.description = request.form.get("description", "").strip()
@@ -248,9 +945,6 @@ def edit_bill(bid):
 # ---------- Receipts ----------
 @app.route("/receipts", methods=["GET", "POST"])
 def receipts():
-    clients = Client.query.order_by(Client.name.asc()).all()
-    bills_for_dropdown = Bill.query.with_entities(Bill.bill_no, Bill.client_id).order_by(Bill.bill_no.asc()).all()
-
     # Handle add form
     if request.method == "POST":
         receipt_ref = request.form.get("receipt_ref", "").strip()
@@ -269,7 +963,7 @@ def receipts():
         elif not Bill.query.filter_by(bill_no=bill_no).first():
             flash("Selected Bill No does not exist.", "danger")
         else:
-            receipt_date = parse_date(receipt_date_str)
+            receipt_date = parse_iso_date(receipt_date_str)
             db.session.add(Receipt(
                 receipt_ref=receipt_ref, receipt_date=receipt_date, client_id=int(client_id),
                 bill_no=bill_no, tds_amt=tds_amt, collection_amount=collection_amount,
@@ -285,38 +979,42 @@ def receipts():
     per_page = request.args.get("per_page", 15, type=int)
 
     # JOIN Client once so filtering on Client.name is valid
-    rq = Receipt.query.join(Client).order_by(Receipt.receipt_date.desc(), Receipt.id.desc())
+    rq = (db.session.query(Receipt, _text_head(Receipt.remarks)).join(Client)
+          .options(contains_eager(Receipt.client), defer(Receipt.remarks))
+          .order_by(Receipt.receipt_date.desc(), Receipt.id.desc()))
     rq = apply_receipt_search(rq, qtext)
 
     total = rq.count()
     page_items = rq.offset((page - 1) * per_page).limit(per_page).all()
 
-    # Build maps once, then annotate only the current page
-    bills_map = dict(db.session.query(Bill.bill_no, Bill.amount).all())
+    # Build maps for the bills on this page only, then annotate the page
+    page_bills = list({r.bill_no for r, _ in page_items if r.bill_no})
+    bills_map = dict(db.session.query(Bill.bill_no, Bill.amount).filter(Bill.bill_no.in_(page_bills)))
     paid_map = dict(
         db.session.query(Receipt.bill_no, db.func.sum(Receipt.collection_amount))
-        .filter(Receipt.bill_no.isnot(None))
+        .filter(Receipt.bill_no.in_(page_bills))
         .group_by(Receipt.bill_no)
         .all()
     )
 
     annotated = []
-    for r in page_items:
+    for r, remarks in page_items:
         bill_amount = bills_map.get(r.bill_no) if r.bill_no else None
         paid_total = paid_map.get(r.bill_no, 0.0) if r.bill_no else None
         status = None
         if bill_amount is not None:
             balance = bill_amount - (paid_total or 0.0)
             status = "Paid" if abs(balance) < 0.0001 else ("Overpaid" if balance < 0 else "Pending")
-        annotated.append((r, bill_amount, status))
+        annotated.append((r, bill_amount, status, remarks))
 
     def _url(p):
         return url_for("receipts", page=p, per_page=per_page, q=qtext)
 
     pagination = build_pagination(total, page, per_page, _url)
+    versions = _data_versions()
     return render_template("receipts.html",
-                        receipts=annotated, clients=clients,
-                        bills_for_dropdown=bills_for_dropdown,
+                        receipts=annotated, client_options=_client_options(versions, "client-opt"),
+                        bill_options=_bill_options(versions),
                         pagination=pagination, qtext=qtext)
 
 
@@ -327,7 +1025,7 @@ def edit_receipt(rid):
     clients = Client.query.order_by(Client.name.asc()).all()
     if request.method == "POST":
         r.receipt_ref = request.form.get("receipt_ref", "").strip()
-        r.receipt_date = parse_date(request.form.get("receipt_date"))
+        r.receipt_date = parse_iso_date(request.form.get("receipt_date"))
         r.client_id = int(request.form.get("client_id"))
         r.bill_no = request.form.get("bill_no", "").strip()
         tds_amt = float(request.form.get("tds_amt") or 0)
@@ -363,89 +1061,265 @@ def delete_row(table, row_id):
         flash("Deleted.", "success")
     return redirect(request.referrer or url_for("dashboard"))
 
+# ---------- Full text ----------
+FULL_TEXT_FIELDS = {"bill": (Bill, ("description", "remarks")), "receipt": (Receipt, ("remarks",))}
+
+@app.get("/text/<table>/<int:row_id>/<field>")
+def full_text(table, row_id, field):
+    # List pages show a preview of long notes; the full text is fetched when opened
+    model, fields = FULL_TEXT_FIELDS.get(table, (None, ()))
+    if field not in fields:
+        abort(404)
+    row = db.session.query(getattr(model, field)).filter(model.id == row_id).one_or_none()
+    if row is None:
+        abort(404)
+    return {"text": row[0] or ""}
+
+# ---------- Import registry ----------
+def _import_already_done(kind: str, digest: str):
+    return ImportedFile.query.filter_by(kind=kind, content_hash=digest).first()
+
+def _flash_already_imported(done):
+    flash(f"This file was already imported on {done.imported_at:%d-%m-%Y %H:%M} "
+          f"({done.row_count} rows). Nothing to do.", "info")
+
+# Columns each importer reads; only these take part in a row's fingerprint
+IMPORT_COLUMNS = {
+    "ledger": ["Client", "Address", "GST", "PAN", "Client Remarks", "Bill No", "Bill Date", "Amount",
+               "Description", "Bill Remarks", "Subject", "Receipt Ref", "Receipt Date", "Paid", "TDS",
+               "Mode", "Receipt Remarks"],
+    "clients": ["Client", "Address", "GST", "PAN", "Remarks"],
+    "bills": ["Bill No", "Bill Date", "Client", "Amount", "Description", "Remarks", "Subject"],
+    "receipts": ["Client", "Bill No", "Receipt Date", "Paid", "TDS", "Receipt Ref", "UTR", "Mode", "Remarks"],
+}
+
+def _fingerprint_value(v) -> str:
+    # The same cell must hash the same whatever dtype pandas inferred for its column:
+    # 10, 10.0 and "10 " are one value, and blank/NaN is empty.
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return ""
+    if isinstance(v, (bool, np.bool_)):
+        return str(bool(v))
+    if isinstance(v, (int, float, np.integer, np.floating)):
+        v = float(v)
+        return str(int(v)) if v.is_integer() else repr(v)
+    if isinstance(v, datetime):
+        return v.date().isoformat() if v.time() == datetime.min.time() else v.isoformat()
+    if isinstance(v, date):
+        return v.isoformat()
+    return str(v).strip()
+
+def _import_fingerprints(kind: str, df: pd.DataFrame, key_col: str):
+    # Natural key per row (Bill No, or lower-cased client name) and a hash of the
+    # normalised values it imports; compared with the registry to split rows into
+    # new/changed/unchanged.
+    keys = df[key_col].astype("string").str.strip()
+    if kind == "clients":
+        keys = keys.str.lower()
+    keys = keys.mask(keys.isna() | (keys == "") | (keys.str.lower() == "nan"))
+    cols = sorted(c for c in df.columns if c in IMPORT_COLUMNS[kind])
+    fps = pd.util.hash_pandas_object(df[cols].map(_fingerprint_value), index=False).map("{:016x}".format)
+    known = {}
+    for chunk in _chunks(keys.dropna().unique().tolist()):
+        known.update(db.session.query(ImportedRow.row_key, ImportedRow.fingerprint)
+                     .filter(ImportedRow.kind == kind, ImportedRow.row_key.in_(chunk)).all())
+    seen = keys.map(known)
+    state = pd.Series(np.where(seen.eq(fps).fillna(False), "unchanged",
+                               np.where(seen.notna(), "changed", "new")), index=df.index)
+    return keys, fps, state
+
+def _record_import(kind: str, digest: str, filename: str, keys, fps, done_idx):
+    done = {k: fp for k, fp in zip(keys[done_idx], fps[done_idx]) if isinstance(k, str)}
+    existing = {}
+    for chunk in _chunks(list(done)):
+        existing.update((r.row_key, r) for r in
+                        ImportedRow.query.filter(ImportedRow.kind == kind, ImportedRow.row_key.in_(chunk)))
+    for key, fp in done.items():
+        if key in existing:
+            existing[key].fingerprint = fp
+        else:
+            db.session.add(ImportedRow(kind=kind, row_key=key, fingerprint=fp))
+    imported = ImportedFile(kind=kind, content_hash=digest, filename=filename[:255], row_count=len(keys))
+    db.session.add(imported)
+    db.session.flush()
+    rows = [{"file_id": imported.id, "row_key": k} for k in keys.dropna().unique().tolist()]
+    if rows:
+        db.session.execute(insert(ImportedFileRow), rows)
+
+@event.listens_for(SASession, "after_flush")
+def _forget_deleted_imports(session, _flush_ctx):
+    # A deleted record must come back if its row is imported again, so drop its registry
+    # entries, and the uploads that contained it so the same file is accepted again.
+    forget = set()
+    conn = None
+    for obj in session.deleted:
+        if isinstance(obj, Bill):
+            forget.update({("bills", obj.bill_no), ("ledger", obj.bill_no)})
+        elif isinstance(obj, Receipt) and obj.bill_no:
+            forget.update({("receipts", obj.bill_no), ("ledger", obj.bill_no)})
+        elif isinstance(obj, Client):
+            forget.add(("clients", obj.name.lower()))
+            conn = conn or session.connection()
+            forget.update(("ledger", bn) for (bn,) in conn.execute(
+                select(Bill.bill_no).where(Bill.client_id == obj.id)))
+    if not forget:
+        return
+    conn = conn or session.connection()
+    for kind in {k for k, _ in forget}:
+        keys = [key for k, key in forget if k == kind]
+        for chunk in _chunks(keys):
+            conn.execute(delete(ImportedRow).where(ImportedRow.kind == kind, ImportedRow.row_key.in_(chunk)))
+            files = [fid for (fid,) in conn.execute(
+                select(ImportedFileRow.file_id).distinct()
+                .join(ImportedFile, ImportedFile.id == ImportedFileRow.file_id)
+                .where(ImportedFile.kind == kind, ImportedFileRow.row_key.in_(chunk)))]
+            for ids in _chunks(files):
+                conn.execute(delete(ImportedFileRow).where(ImportedFileRow.file_id.in_(ids)))
+                conn.execute(delete(ImportedFile).where(ImportedFile.id.in_(ids)))
+
+def _write_transaction():
+    # Importers read (registry, conflict checks) before writing; end that implicit
+    # read transaction so the whole import runs in one fresh transaction.
+    db.session.rollback()
+    return db.session.begin()
+
+def _clients_by_name():
+    return {c.name.lower(): c for c in Client.query.all()}
+
+
 # ---------- Import (two-step: preview then confirm) ----------
 @app.route("/import", methods=["GET", "POST"])
 def import_data():
     # GET: show page (if a temp file exists, the template may choose to ignore or re-upload)
     if request.method == "GET":
-        return render_template("import.html")
+        return render_template("import.html", preview=None)
 
     # Step B: confirm import
     if request.form.get("confirm"):
-        tmp_path = session.pop("import_temp", None)
-        if not tmp_path or not os.path.exists(tmp_path):
+        pending = session.pop("import_temp", None) or {}
+        digest = pending.get("digest")
+        try:
+            tmp_path = _upload_path(digest, pending.get("ext"))
+        except ValueError:
+            tmp_path = None
+        if not tmp_path or not (os.path.exists(_parsed_cache_path(digest)) or os.path.exists(tmp_path)):
             flash("No file to import. Upload again.", "danger")
             return redirect(url_for("import_data"))
+        done = _import_already_done("ledger", digest)
+        if done:
+            _discard_upload(tmp_path)
+            _flash_already_imported(done)
+            return redirect(url_for("dashboard"))
 
         try:
-            df = _read_tabular(tmp_path)
+            sheets = _load_tabular(tmp_path, digest)
+        except Exception as e:
+            flash(f"Could not parse file: {e}", "danger")
+            return redirect(url_for("import_data"))
         finally:
-            try:
-                os.remove(tmp_path)
-            except Exception:
-                pass
+            _discard_upload(tmp_path)
 
         required = ["Client", "Bill No", "Bill Date", "Amount"]
-        missing = _required_missing(df, required)
-        if missing:
-            flash(f"Missing columns: {', '.join(missing)}", "danger")
+        df, skipped_sheets = _merge_sheets(sheets, required)
+        if df is None:
+            _flash_unusable(skipped_sheets)
             return redirect(url_for("import_data"))
 
+        keys, fps, state = _import_fingerprints("ledger", df, "Bill No")
+        bill_dates, bad_bill_dates = parse_date_column(df["Bill Date"], required=True)
+        if "Receipt Date" in df.columns:
+            receipt_dates, bad_receipt_dates = parse_date_column(df["Receipt Date"])
+        else:
+            receipt_dates, bad_receipt_dates = pd.Series([None] * len(df), index=df.index, dtype=object), []
+        skipped = set(bad_bill_dates)
+        bad_receipt_rows = set(bad_receipt_dates)
+
+        clients = _clients_by_name()
+        known_bills = {b.bill_no: b for chunk in _chunks(keys.dropna().unique().tolist())
+                       for b in Bill.query.filter(Bill.bill_no.in_(chunk))}
+        known_receipts = {r.bill_no: r for chunk in _chunks(keys.dropna().unique().tolist())
+                          for r in Receipt.query.filter(Receipt.bill_no.in_(chunk))}
+
         created_clients = 0
         created_bills = 0
         created_receipts = 0
+        updated = 0
+        processed = []
 
-        with db.session.begin():
-            for _, row in df.iterrows():
+        with _write_transaction():
+            for idx, row in df.iterrows():
+                if idx in skipped or state[idx] == "unchanged":
+                    continue
                 # Upsert client
-                cname = str(row.get("Client") or "").strip()
+                cname = _cell_text(row, "Client")
                 if not cname:
                     continue
-                client = Client.query.filter(db.func.lower(Client.name) == cname.lower()).first()
+                client = clients.get(cname.lower())
                 if not client:
                     client = Client(
                         name=cname,
-                        address=str(row.get("Address") or "").strip(),
-                        gst_no=str(row.get("GST") or "").strip(),
-                        pan_no=str(row.get("PAN") or "").strip(),
-                        remarks=str(row.get("Client Remarks") or "").strip(),
+                        address=_cell_text(row, "Address"),
+                        gst_no=_cell_text(row, "GST"),
+                        pan_no=_cell_text(row, "PAN"),
+                        remarks=_cell_text(row, "Client Remarks"),
                     )
                     db.session.add(client)
                     db.session.flush()
+                    clients[cname.lower()] = client
                     created_clients += 1
 
-                # Bill
-                bill_no = str(row.get("Bill No") or "").strip()
-                if bill_no and not Bill.query.filter_by(bill_no=bill_no).first():
-                    bill = Bill(
-                        bill_no=bill_no,
-                        bill_date=parse_date(str(row.get("Bill Date") or "")),
-                        client_id=client.id,
-                        amount=float(row.get("Amount") or 0),
-                        description=str(row.get("Description") or "").strip(),
-                        remarks=str(row.get("Bill Remarks") or "").strip(),
-                        Subject=str(row.get("Subject") or "").strip(),
-                    )
-                    db.session.add(bill)
+                # Bill: new rows are inserted; rows changed since the last import update it
+                bill_no = _cell_text(row, "Bill No")
+                bill_fields = dict(
+                    bill_date=bill_dates[idx],
+                    client_id=client.id,
+                    amount=_cell_amount(row, "Amount"),
+                    description=_cell_text(row, "Description"),
+                    remarks=_cell_text(row, "Bill Remarks"),
+                    Subject=_cell_text(row, "Subject"),
+                )
+                if bill_no and bill_no not in known_bills:
+                    known_bills[bill_no] = Bill(bill_no=bill_no, **bill_fields)
+                    db.session.add(known_bills[bill_no])
                     created_bills += 1
+                elif bill_no and state[idx] == "changed":
+                    for k, v in bill_fields.items():
+                        setattr(known_bills[bill_no], k, v)
+                    updated += 1
 
                 # Receipt (optional)
-                paid = float(row.get("Paid") or 0)
-                tds = float(row.get("TDS") or 0)
-                if bill_no and (paid or tds):
-                    db.session.add(Receipt(
-                        receipt_ref=str(row.get("Receipt Ref") or "").strip(),
-                        receipt_date=parse_date(str(row.get("Receipt Date") or "")) or parse_date(str(row.get("Bill Date") or "")),
+                paid = _cell_amount(row, "Paid")
+                tds = _cell_amount(row, "TDS")
+                receipt_date = receipt_dates[idx] or bill_dates[idx]
+                if bill_no and (paid or tds) and receipt_date and idx not in bad_receipt_rows:
+                    receipt_fields = dict(
+                        receipt_ref=_cell_text(row, "Receipt Ref"),
+                        receipt_date=receipt_date,
                         client_id=client.id,
                         bill_no=bill_no,
                         tds_amt=tds,
                         collection_amount=paid + tds,
-                        mode=str(row.get("Mode") or "").strip(),
-                        remarks=str(row.get("Receipt Remarks") or "").strip(),
-                    ))
-                    created_receipts += 1
-
-        flash(f"Imported: {created_clients} clients, {created_bills} bills, {created_receipts} receipts.", "success")
+                        mode=_cell_text(row, "Mode"),
+                        remarks=_cell_text(row, "Receipt Remarks"),
+                    )
+                    if state[idx] == "changed" and bill_no in known_receipts:
+                        for k, v in receipt_fields.items():
+                            setattr(known_receipts[bill_no], k, v)
+                    else:
+                        known_receipts[bill_no] = Receipt(**receipt_fields)
+                        db.session.add(known_receipts[bill_no])
+                        created_receipts += 1
+                processed.append(idx)
+
+            _record_import("ledger", digest, pending.get("filename") or "", keys, fps, processed)
+
+        _flash_sheets(sheets, skipped_sheets, processed)
+        _flash_bad_dates(df, "Bill Date", bad_bill_dates)
+        # The bill on these rows is still imported; only the receipt is left out
+        _flash_bad_dates(df, "Receipt Date", [i for i in bad_receipt_dates if i not in skipped],
+                         outcome="Bill imported but receipt not recorded for")
+        flash(f"Imported: {created_clients} clients, {created_bills} bills, {created_receipts} receipts; "
+              f"{updated} changed rows updated, {int((state == 'unchanged').sum())} unchanged rows skipped.", "success")
         return redirect(url_for("dashboard"))
 
     # Step A: file upload -> save temp -> preview
@@ -455,85 +1329,117 @@ def import_data():
         return redirect(url_for("import_data"))
 
     filename = secure_filename(file.filename)
-    ext = os.path.splitext(filename)[5].lower()
+    ext = os.path.splitext(filename)[1].lower()
     if ext not in ALLOWED_IMPORT_EXTS:
         flash("Unsupported file type. Upload .csv or .xlsx/.xls.", "danger")
         return redirect(url_for("import_data"))
 
-    tmp_dir = os.path.join(app.instance_path, "tmp")
-    os.makedirs(tmp_dir, exist_ok=True)
-    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=ext)
-    with os.fdopen(fd, "wb") as out:
-        out.write(file.read())
-
-    session["import_temp"] = tmp_path
+    _prune_import_cache()
+    tmp_path, digest = _save_upload(file, ext)
+    done = _import_already_done("ledger", digest)
+    if done:
+        _discard_upload(tmp_path)
+        _flash_already_imported(done)
+        return redirect(url_for("import_data"))
+    session["import_temp"] = {"digest": digest, "ext": ext, "filename": filename}
 
+    # Preview reads only the first rows; the full parse waits for confirm
     try:
-        df = _read_tabular(tmp_path)
+        df = _preview_tabular(tmp_path, digest)
     except Exception as e:
         flash(f"Could not parse file: {e}", "danger")
-        try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+        _discard_upload(tmp_path)
         session.pop("import_temp", None)
         return redirect(url_for("import_data"))
 
-    # Render preview (template can show df.head(10))
     return render_template("import.html", preview=df)
 
 
-# --- Import Clients (CSV/Excel) ---
-# --- Import Clients (CSV/Excel) ---
-@app.post("/import/clients/now")
-def import_clients_now():
+def _upload_for_import(kind: str, back: str, required: list[str]):
+    # Shared first step of the /import/<kind>/now routes: parse, validate every sheet and
+    # merge the usable ones. Returns ((df, digest, filename, sheets, skipped), None) or (None, redirect).
     f = request.files.get("file")
     if not f or f.filename == "":
         flash("Choose a CSV or Excel file.", "danger")
-        return redirect(url_for("list_clients"))
+        return None, redirect(url_for(back))
 
-    # FIXED: use [2] (or Path(f.filename).suffix.lower())
-    ext = os.path.splitext(f.filename)[2].lower()
-    if ext not in {".csv", ".xlsx", ".xls"}:
+    ext = os.path.splitext(f.filename)[1].lower()
+    if ext not in ALLOWED_IMPORT_EXTS:
         flash("Only .csv or .xlsx/.xls allowed.", "danger")
-        return redirect(url_for("list_clients"))
+        return None, redirect(url_for(back))
 
-    # Parse with pandas
-    df = pd.read_csv(f) if ext == ".csv" else pd.read_excel(f)
+    tmp_path, digest = _save_upload(f, ext)
+    done = _import_already_done(kind, digest)
+    if done:
+        _discard_upload(tmp_path)
+        _flash_already_imported(done)
+        return None, redirect(url_for(back))
 
+    # Parse with pandas (cached by content hash, so a repeat upload skips parsing)
+    try:
+        sheets = _load_tabular(tmp_path, digest)
+    except Exception as e:
+        flash(f"Could not parse file: {e}", "danger")
+        return None, redirect(url_for(back))
+    finally:
+        _discard_upload(tmp_path)
+
+    df, skipped = _merge_sheets(sheets, required)
+    if df is None:
+        _flash_unusable(skipped)
+        return None, redirect(url_for(back))
+    return (df, digest, secure_filename(f.filename), sheets, skipped), None
+
+
+# --- Import Clients (CSV/Excel) ---
+@app.post("/import/clients/now")
+def import_clients_now():
     required = ["Client"]  # Optional: Address, GST, PAN, Remarks
-    missing = [c for c in required if c not in df.columns]
-    if missing:
-        flash(f"Missing columns: {', '.join(missing)}", "danger")
-        return redirect(url_for("list_clients"))
+    upload, resp = _upload_for_import("clients", "list_clients", required)
+    if resp:
+        return resp
+    df, digest, filename, sheets, skipped_sheets = upload
 
+    keys, fps, state = _import_fingerprints("clients", df, "Client")
+    clients = _clients_by_name()
     created = 0
-    with db.session.begin():
-        for _, row in df.iterrows():
-            name = str(row.get("Client") or "").strip()
+    updated = 0
+    processed = []
+    with _write_transaction():
+        for idx, row in df.iterrows():
+            if state[idx] == "unchanged":
+                continue
+            name = _cell_text(row, "Client")
             if not name:
                 continue
-            exists = Client.query.filter(db.func.lower(Client.name) == name.lower()).first()
+            exists = clients.get(name.lower())
             if exists:
-                if "Address" in df.columns:
-                    exists.address = str(row.get("Address") or "").strip()
-                if "GST" in df.columns:
-                    exists.gst_no = str(row.get("GST") or "").strip()
-                if "PAN" in df.columns:
-                    exists.pan_no = str(row.get("PAN") or "").strip()
-                if "Remarks" in df.columns:
-                    exists.remarks = str(row.get("Remarks") or "").strip()
+                columns = _sheet_columns(sheets, df, idx)
+                if "Address" in columns:
+                    exists.address = _cell_text(row, "Address")
+                if "GST" in columns:
+                    exists.gst_no = _cell_text(row, "GST")
+                if "PAN" in columns:
+                    exists.pan_no = _cell_text(row, "PAN")
+                if "Remarks" in columns:
+                    exists.remarks = _cell_text(row, "Remarks")
+                updated += 1
             else:
-                db.session.add(Client(
+                clients[name.lower()] = Client(
                     name=name,
-                    address=str(row.get("Address") or "").strip(),
-                    gst_no=str(row.get("GST") or "").strip(),
-                    pan_no=str(row.get("PAN") or "").strip(),
-                    remarks=str(row.get("Remarks") or "").strip(),
-                ))
+                    address=_cell_text(row, "Address"),
+                    gst_no=_cell_text(row, "GST"),
+                    pan_no=_cell_text(row, "PAN"),
+                    remarks=_cell_text(row, "Remarks"),
+                )
+                db.session.add(clients[name.lower()])
                 created += 1
+            processed.append(idx)
+        _record_import("clients", digest, filename, keys, fps, processed)
 
-    flash(f"Clients import complete. Created {created}.", "success")
+    _flash_sheets(sheets, skipped_sheets, processed)
+    flash(f"Clients import complete. Created {created}, updated {updated}, "
+          f"unchanged {int((state == 'unchanged').sum())}.", "success")
     return redirect(url_for("list_clients"))
 
 
@@ -541,77 +1447,80 @@ def import_clients_now():
 # --- Import Bills (CSV/Excel) ---
 @app.post("/import/bills/now")
 def import_bills_now():
-    f = request.files.get("file")
-    if not f or f.filename == "":
-        flash("Choose a CSV or Excel file.", "danger")
-        return redirect(url_for("bills"))
+    required = ["Bill No", "Bill Date", "Client", "Amount"]
+    upload, resp = _upload_for_import("bills", "bills", required)
+    if resp:
+        return resp
+    df, digest, filename, sheets, skipped_sheets = upload
 
-    # FIX: use [1], not [4]
-    ext = os.path.splitext(f.filename)[1].lower()
-    if ext not in {".csv", ".xlsx", ".xls"}:
-        flash("Only .csv or .xlsx/.xls allowed.", "danger")
-        return redirect(url_for("bills"))
+    keys, fps, state = _import_fingerprints("bills", df, "Bill No")
+    bill_dates, bad_dates = parse_date_column(df["Bill Date"], required=True)
+    skipped = set(bad_dates)
 
-    df = pd.read_csv(f) if ext == ".csv" else pd.read_excel(f)
-    required = ["Bill No", "Bill Date", "Client", "Amount"]
-    missing = [c for c in required if c not in df.columns]
-    if missing:
-        flash(f"Missing columns: {', '.join(missing)}", "danger")
-        return redirect(url_for("bills"))
+    # Only new and changed rows reach the database; their bills are loaded in one pass
+    todo = keys[(state != "unchanged") & keys.notna()].unique().tolist()
+    known_bills = {b.bill_no: b for chunk in _chunks(todo) for b in Bill.query.filter(Bill.bill_no.in_(chunk))}
+    clients = _clients_by_name()
 
     created = 0
-    with db.session.begin():  # atomic insert [1]
-        for _, row in df.iterrows():
-            cname = str(row.get("Client") or "").strip()
+    updated = 0
+    processed = []
+    with _write_transaction():  # atomic insert [1]
+        for idx, row in df.iterrows():
+            if idx in skipped or state[idx] == "unchanged":
+                continue
+            cname = _cell_text(row, "Client")
             if not cname:
                 continue
-            client = Client.query.filter(db.func.lower(Client.name) == cname.lower()).first()
+            client = clients.get(cname.lower())
             if not client:
                 client = Client(name=cname)
                 db.session.add(client)
                 db.session.flush()
+                clients[cname.lower()] = client
 
-            bill_no = str(row.get("Bill No") or "").strip()
-            if not bill_no or Bill.query.filter_by(bill_no=bill_no).first():
+            bill_no = _cell_text(row, "Bill No")
+            if not bill_no:
                 continue
-
-            db.session.add(Bill(
-                bill_no=bill_no,
-                bill_date=parse_date(str(row.get("Bill Date") or "")),
+            bill_fields = dict(
+                bill_date=bill_dates[idx],
                 client_id=client.id,
-                amount=float(row.get("Amount") or 0),
-                description=str(row.get("Description") or "").strip(),
-                remarks=str(row.get("Remarks") or "").strip(),
-                Subject=str(row.get("Subject") or "").strip(),
-            ))
-            created += 1
-
-    flash(f"Bills import complete. Created {created}.", "success")
+                amount=_cell_amount(row, "Amount"),
+                description=_cell_text(row, "Description"),
+                remarks=_cell_text(row, "Remarks"),
+                Subject=_cell_text(row, "Subject"),
+            )
+            if bill_no not in known_bills:
+                known_bills[bill_no] = Bill(bill_no=bill_no, **bill_fields)
+                db.session.add(known_bills[bill_no])
+                created += 1
+            elif state[idx] == "changed":
+                # Bill came from an earlier import and its row has been edited since
+                for k, v in bill_fields.items():
+                    setattr(known_bills[bill_no], k, v)
+                updated += 1
+            else:
+                continue  # entered by hand, never overwritten by an import
+            processed.append(idx)
+        _record_import("bills", digest, filename, keys, fps, processed)
+
+    _flash_sheets(sheets, skipped_sheets, processed)
+    _flash_bad_dates(df, "Bill Date", bad_dates)
+    flash(f"Bills import complete. Created {created}, updated {updated}, "
+          f"unchanged {int((state == 'unchanged').sum())}.", "success")
     return redirect(url_for("bills"))
 
-# --- Import Receipts (CSV/Excel) ---
 # --- Import Receipts (CSV/Excel) ---
 @app.post("/import/receipts/now")
 def import_receipts_now():
-    f = request.files.get("file")
-    if not f or f.filename == "":
-        flash("Choose a CSV or Excel file.", "danger")
-        return redirect(url_for("receipts"))
-
-    # FIXED: use [2] (or Path(f.filename).suffix.lower())
-    ext = os.path.splitext(f.filename)[1].lower()
-    if ext not in {".csv", ".xlsx", ".xls"}:
-        flash("Only .csv or .xlsx/.xls allowed.", "danger")
-        return redirect(url_for("receipts"))
-
-    # Parse with pandas
-    df = pd.read_csv(f) if ext == ".csv" else pd.read_excel(f)
-
     required = ["Client", "Bill No", "Receipt Date", "Paid", "TDS"]
-    missing = [c for c in required if c not in df.columns]
-    if missing:
-        flash(f"Missing columns: {', '.join(missing)}", "danger")
-        return redirect(url_for("receipts"))
+    upload, resp = _upload_for_import("receipts", "receipts", required)
+    if resp:
+        return resp
+    df, digest, filename, sheets, skipped_sheets = upload
+
+    # Fingerprint before normalising so a re-upload hashes identically
+    keys, fps, state = _import_fingerprints("receipts", df, "Bill No")
 
     # Normalize Bill No once
     df['Bill No'] = df['Bill No'].astype(str).str.strip()
@@ -622,12 +1531,11 @@ def import_receipts_now():
         .dropna().astype(str).str.strip().unique().tolist()
     )
 
-    # 2) Overlaps with existing receipts in DB (one receipt per bill rule)
-    file_bill_nos = df['Bill No'].dropna().astype(str).str.strip().tolist()
-    existing_bills = {
-        bn for (bn,) in db.session.query(Receipt.bill_no)
-            .filter(Receipt.bill_no.in_(file_bill_nos)).all()
-    }
+    # 2) Overlaps with existing receipts in DB (one receipt per bill rule).
+    # Rows imported before are not conflicts: unchanged ones are skipped and
+    # changed ones update the receipt they created.
+    new_bill_nos = df.loc[state == "new", 'Bill No'].tolist()
+    existing_bills = _existing(Receipt.bill_no, new_bill_nos)
 
     # Combine conflicts and block upload if any
     conflicts = sorted(set(dups_in_file) | existing_bills)
@@ -641,39 +1549,126 @@ def import_receipts_now():
         )
         return redirect(url_for("receipts"))
 
+    receipt_dates, bad_dates = parse_date_column(df["Receipt Date"], required=True)
+    skipped = set(bad_dates)
+    changed_bill_nos = df.loc[state == "changed", 'Bill No'].tolist()
+    known_receipts = {r.bill_no: r for chunk in _chunks(changed_bill_nos)
+                      for r in Receipt.query.filter(Receipt.bill_no.in_(chunk))}
+    clients = _clients_by_name()
+
     # If no conflicts, proceed with the usual insert loop...
     created = 0
-    with db.session.begin():
-        for _, row in df.iterrows():
-            cname = str(row.get("Client") or "").strip()
-            client = Client.query.filter(db.func.lower(Client.name) == cname.lower()).first()
+    updated = 0
+    processed = []
+    with _write_transaction():
+        for idx, row in df.iterrows():
+            if idx in skipped or state[idx] == "unchanged":
+                continue
+            cname = _cell_text(row, "Client")
+            client = clients.get(cname.lower())
             if not client:
                 continue
-            bill_no = str(row.get("Bill No") or "").strip()
-            paid = float(row.get("Paid") or 0)
-            tds = float(row.get("TDS") or 0)
+            bill_no = _cell_text(row, "Bill No")
+            paid = _cell_amount(row, "Paid")
+            tds = _cell_amount(row, "TDS")
             total = paid + tds
             if not bill_no or total <= 0:
                 continue
-            db.session.add(Receipt(
-                receipt_ref=str(row.get("Receipt Ref") or "").strip(),
-                receipt_date=parse_date(str(row.get("Receipt Date") or "")),
+            receipt_fields = dict(
+                receipt_ref=_cell_text(row, "Receipt Ref"),
+                receipt_date=receipt_dates[idx],
                 client_id=client.id,
                 bill_no=bill_no,
                 tds_amt=tds,
                 collection_amount=total,
-                utr_details=str(row.get("UTR") or "").strip(),
-                mode=str(row.get("Mode") or "").strip(),
-                remarks=str(row.get("Remarks") or "").strip(),
-            ))
-            created += 1
+                utr_details=_cell_text(row, "UTR"),
+                mode=_cell_text(row, "Mode"),
+                remarks=_cell_text(row, "Remarks"),
+            )
+            if bill_no in known_receipts:
+                for k, v in receipt_fields.items():
+                    setattr(known_receipts[bill_no], k, v)
+                updated += 1
+            else:
+                db.session.add(Receipt(**receipt_fields))
+                created += 1
+            processed.append(idx)
+        _record_import("receipts", digest, filename, keys, fps, processed)
 
-    flash(f"Receipts import complete. Created {created}.", "success")
+    _flash_sheets(sheets, skipped_sheets, processed)
+    _flash_bad_dates(df, "Receipt Date", bad_dates)
+    flash(f"Receipts import complete. Created {created}, updated {updated}, "
+          f"unchanged {int((state == 'unchanged').sum())}.", "success")
     return redirect(url_for("receipts"))
 
 
 
-def _send_df(df, fmt: str, base_name: str):
+# ---------- Export formats ----------
+# Parquet/Arrow files are written one record batch (row group) at a time from the cursor,
+# into a temp file that only spills to disk for large exports.
+EXPORT_BATCH_ROWS = 50_000
+EXPORT_SPOOL_BYTES = 32 * 1024 * 1024
+COLUMNAR_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+def _arrow_type(sa_type):
+    if isinstance(sa_type, sqltypes.DateTime):
+        return pa.timestamp("us")
+    if isinstance(sa_type, sqltypes.Date):
+        return pa.date32()
+    if isinstance(sa_type, sqltypes.Integer):
+        return pa.int64()
+    if isinstance(sa_type, (sqltypes.Float, sqltypes.Numeric)):
+        return pa.float64()
+    return pa.string()
+
+def _arrow_column(values, arrow_type):
+    # SQLite does not enforce column types, so text columns may hold imported numbers
+    if arrow_type == pa.string():
+        values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+    return pa.array(values, type=arrow_type)
+
+def _query_batches(stmt):
+    schema = pa.schema([(c.name, _arrow_type(c.type)) for c in stmt.selected_columns])
+    def batches():
+        result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_ROWS))
+        for rows in result.partitions():
+            columns = zip(*rows)
+            yield pa.RecordBatch.from_arrays(
+                [_arrow_column(col, field.type) for col, field in zip(columns, schema)], schema=schema)
+    return schema, batches()
+
+def _send_columnar(schema, batches, fmt: str, base_name: str):
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(out, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(out, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    with writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    out.seek(0)
+    return send_file(out, mimetype=COLUMNAR_FORMATS[fmt], as_attachment=True,
+                     download_name=f"{base_name}.{fmt}")
+
+def _columnar_unavailable(fmt: str):
+    if fmt in COLUMNAR_FORMATS and pa is None:
+        flash(f"{fmt.capitalize()} export needs the pyarrow package installed.", "danger")
+        return redirect(request.referrer or url_for("dashboard"))
+    return None
+
+def _send_export(stmt, fmt: str, base_name: str, sheet_name: str = "Sheet1"):
+    # Columnar formats stream from the cursor; CSV/XLSX go through a DataFrame
+    unavailable = _columnar_unavailable(fmt)
+    if unavailable is not None:
+        return unavailable
+    if fmt in COLUMNAR_FORMATS:
+        return _send_columnar(*_query_batches(stmt), fmt, base_name)
+    return _send_df(pd.read_sql(stmt, db.session.connection()), fmt, base_name, sheet_name)
+
+def _send_df(df, fmt: str, base_name: str, sheet_name: str = "Sheet1"):
     # Normalize column order and types if needed
     if fmt == "csv":
         buf = io.StringIO()
@@ -688,7 +1683,7 @@ def _send_df(df, fmt: str, base_name: str):
     elif fmt == "xlsx":
         out = io.BytesIO()
         with pd.ExcelWriter(out, engine="openpyxl") as writer:
-            df.to_excel(writer, index=False, sheet_name="Sheet1")  # pandas DataFrame.to_excel [15]
+            df.to_excel(writer, index=False, sheet_name=sheet_name)  # pandas DataFrame.to_excel [15]
         out.seek(0)
         return send_file(
             out,
@@ -703,6 +1698,7 @@ def _send_df(df, fmt: str, base_name: str):
 
 
 @app.route("/export/bills.<fmt>")
+@reporting_read
 def export_bills(fmt):
     qtext = request.args.get("q", "", type=str)  # search term [2]
     q = (
@@ -717,10 +1713,10 @@ def export_bills(fmt):
         ).join(Client, Bill.client_id == Client.id)
     )
     q = apply_bill_search(q, qtext)  # reuse filter [12]
-    df = pd.read_sql(q.statement, db.engine)
-    return _send_df(df, fmt, "bills")  # to_csv/to_excel + send_file [21][16][8]
+    return _send_export(q.statement, fmt, "bills")  # to_csv/to_excel + send_file [21][16][8]
 
 @app.route("/export/receipts.<fmt>")
+@reporting_read
 def export_receipts(fmt):
     qtext = request.args.get("q", "", type=str)  # search term [2]
     rq = (
@@ -728,90 +1724,242 @@ def export_receipts(fmt):
             Receipt.receipt_date.label("Receipt Date"),
             Client.name.label("Client"),
             Receipt.bill_no.label("Bill No"),
+            Bill.amount.label("Bill Amount"),
             Receipt.tds_amt.label("TDS"),
             Receipt.collection_amount.label("Collection"),
             Receipt.utr_details.label("UTR"),
             Receipt.mode.label("Mode"),
             Receipt.remarks.label("Remarks"),
         ).join(Client, Receipt.client_id == Client.id)
+        .outerjoin(Bill, Receipt.bill_no == Bill.bill_no)
     )
     rq = apply_receipt_search(rq, qtext)  # reuse filter [12]
-    df = pd.read_sql(rq.statement, db.engine)
-    bills_map = dict(db.session.query(Bill.bill_no, Bill.amount).all())
-    df["Bill Amount"] = df["Bill No"].map(bills_map).fillna("")
-    df = df.reindex(columns=["Receipt Date","Client","Bill No","Bill Amount","TDS","Collection","UTR","Mode","Remarks"])
-    return _send_df(df, fmt, "receipts")  # CSV/XLSX [21][16][8]
+    return _send_export(rq.statement, fmt, "receipts")  # CSV/XLSX [21][16][8]
+
+
+# ---------- Reconciliation ----------
+# Bills are reconciled against their receipts dated inside the selected range.
+def _status_expr(balance):
+    return case((func.abs(balance) < 0.0001, "Paid"), (balance < 0, "Overpaid"), else_="Pending")
+
+def _period_of(column):
+    return func.strftime("%Y-%m", column)
+
+def _closed_period_list() -> list[str]:
+    return [p for (p,) in db.session.query(ClosedPeriod.period).order_by(ClosedPeriod.period)]
+
+def _receipt_totals(client_q="", dfrom=None, dto=None):
+    rq = (select(Receipt.bill_no,
+                 func.sum(Receipt.collection_amount).label("paid"),
+                 func.sum(func.coalesce(Receipt.tds_amt, 0.0)).label("tds"))
+          .where(Receipt.bill_no.isnot(None)))
+    if client_q:
+        rq = rq.join(Client, Receipt.client_id == Client.id).where(Client.name.ilike(f"%{client_q}%"))
+    if dfrom:
+        rq = rq.where(Receipt.receipt_date >= dfrom)
+    if dto:
+        rq = rq.where(Receipt.receipt_date <= dto)
+    return rq.group_by(Receipt.bill_no).subquery()
+
+def _recon_select(client_q="", dfrom=None, dto=None, status="", exclude_periods=(), details=False):
+    in_range = _receipt_totals(client_q, dfrom, dto)
+    paid = func.coalesce(in_range.c.paid, 0.0)
+    tds = func.coalesce(in_range.c.tds, 0.0)
+    balance = Bill.amount - paid
+
+    cols = [Bill.id, Bill.bill_no, Bill.bill_date, Bill.client_id, Bill.amount]
+    if details:
+        cols += [Bill.description, Bill.remarks, Bill.Subject]
+    cols += [Client.name.label("client_name"), paid.label("paid_amount"), tds.label("tds_amount"),
+             balance.label("balance"), _status_expr(balance).label("status")]
+
+    stmt = (select(*cols).select_from(Bill).outerjoin(Client, Bill.client_id == Client.id)
+            .outerjoin(in_range, in_range.c.bill_no == Bill.bill_no))
+    if client_q:
+        stmt = stmt.where(Client.name.ilike(f"%{client_q}%"))
+    if dfrom:
+        stmt = stmt.where(Bill.bill_date >= dfrom)
+    if dto:
+        stmt = stmt.where(Bill.bill_date <= dto)
+    if status:
+        stmt = stmt.where(func.lower(_status_expr(balance)) == status.lower())
+    if exclude_periods:
+        stmt = stmt.where(_period_of(Bill.bill_date).notin_(list(exclude_periods)))
+    return stmt
+
+
+# ---------- Period snapshots ----------
+def _period_bounds(period: str):
+    start = datetime.strptime(period, "%Y-%m").date()
+    nxt = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, date.fromordinal(nxt.toordinal() - 1)
+
+def _periods_covered(dfrom=None, dto=None) -> list[str]:
+    # Closed months whose bills and receipts all lie inside [dfrom, dto]; for those the
+    # snapshot (taken against every receipt) gives the same figures as the live query
+    out = []
+    for cp in ClosedPeriod.query.order_by(ClosedPeriod.period):
+        start, end = _period_bounds(cp.period)
+        if dfrom is not None and (dfrom > start or (cp.first_receipt and dfrom > cp.first_receipt)):
+            continue
+        if dto is not None and (dto < end or (cp.last_receipt and dto < cp.last_receipt)):
+            continue
+        out.append(cp.period)
+    return out
+
+def _close_period(period: str) -> int:
+    start, end = _period_bounds(period)
+    settled = _receipt_totals()
+    paid = func.coalesce(settled.c.paid, 0.0)
+    balance = Bill.amount - paid
+    status = _status_expr(balance)
+    rows = db.session.execute(
+        select(Bill.client_id, status.label("status"), func.count(Bill.id),
+               func.sum(Bill.amount), func.sum(paid),
+               func.sum(func.coalesce(settled.c.tds, 0.0)), func.sum(balance))
+        .outerjoin(settled, settled.c.bill_no == Bill.bill_no)
+        .where(Bill.bill_date >= start, Bill.bill_date <= end)
+        .group_by(Bill.client_id, status)
+    ).all()
+    first_receipt, last_receipt = db.session.execute(
+        select(func.min(Receipt.receipt_date), func.max(Receipt.receipt_date))
+        .where(Receipt.bill_no.in_(select(Bill.bill_no).where(Bill.bill_date >= start, Bill.bill_date <= end)))
+    ).one()
+    PeriodSnapshot.query.filter_by(period=period).delete()
+    db.session.add_all(
+        PeriodSnapshot(period=period, client_id=cid, status=st, bill_count=n,
+                       billed=billed or 0.0, collected=collected or 0.0, tds=tds or 0.0, balance=bal or 0.0)
+        for cid, st, n, billed, collected, tds, bal in rows
+    )
+    db.session.merge(ClosedPeriod(period=period, closed_at=datetime.now(),
+                                  first_receipt=first_receipt, last_receipt=last_receipt))
+    db.session.commit()
+    return len(rows)
+
+def _reopen_period(period: str):
+    PeriodSnapshot.query.filter_by(period=period).delete()
+    ClosedPeriod.query.filter_by(period=period).delete()
+    db.session.commit()
+
+def _snapshot_totals(periods, client_q="", status=""):
+    q = db.session.query(PeriodSnapshot.status, func.sum(PeriodSnapshot.bill_count),
+                         func.sum(PeriodSnapshot.billed), func.sum(PeriodSnapshot.collected),
+                         func.sum(PeriodSnapshot.tds), func.sum(PeriodSnapshot.balance)
+                         ).filter(PeriodSnapshot.period.in_(periods))
+    if client_q:
+        q = q.filter(PeriodSnapshot.client_id.in_(select(Client.id).where(Client.name.ilike(f"%{client_q}%"))))
+    if status:
+        q = q.filter(func.lower(PeriodSnapshot.status) == status.lower())
+    return q.group_by(PeriodSnapshot.status).all()
+
+def _live_totals(stmt):
+    sub = stmt.subquery()
+    return db.session.execute(
+        select(sub.c.status, func.count(), func.sum(sub.c.amount), func.sum(sub.c.paid_amount),
+               func.sum(sub.c.tds_amount), func.sum(sub.c.balance)).group_by(sub.c.status)
+    ).all()
+
+def _dashboard_totals(client_q, dfrom, dto, status):
+    # Closed months fully inside the range come from their snapshots; only the rest is aggregated live
+    frozen = _periods_covered(dfrom, dto)
+    live = _recon_select(client_q, dfrom, dto, status, exclude_periods=frozen)
+    groups = list(_live_totals(live)) + (list(_snapshot_totals(frozen, client_q, status)) if frozen else [])
+    totals = {"total_bills": 0.0, "total_paid": 0.0, "total_tds": 0.0, "total_balance": 0.0,
+              "count_pending": 0, "count_paid": 0, "count_overpaid": 0}
+    for st, n, billed, collected, tds, bal in groups:
+        totals["total_bills"] += billed or 0.0
+        totals["total_paid"] += collected or 0.0
+        totals["total_tds"] += tds or 0.0
+        totals["total_balance"] += bal or 0.0
+        totals[f"count_{st.lower()}"] += int(n or 0)
+    return totals
+
+
+@app.post("/periods/close")
+def close_period():
+    period = (request.form.get("period") or "").strip()
+    try:
+        _, end = _period_bounds(period)
+    except ValueError:
+        flash("Choose a month to close.", "danger")
+        return redirect(url_for("dashboard"))
+    if end >= date.today():
+        flash(f"{period} has not ended yet and cannot be closed.", "danger")
+        return redirect(url_for("dashboard"))
+    groups = _close_period(period)
+    flash(f"Closed {period}: snapshot of {groups} client/status groups saved.", "success")
+    return redirect(url_for("dashboard"))
+
+@app.post("/periods/<period>/reopen")
+def reopen_period(period):
+    _reopen_period(period)
+    flash(f"Reopened {period}.", "success")
+    return redirect(url_for("dashboard"))
+
+@app.cli.command("close-period")
+@click.argument("period")
+def close_period_command(period):
+    """Snapshot a finished month (YYYY-MM) for the dashboard."""
+    _, end = _period_bounds(period)
+    if end >= date.today():
+        raise click.ClickException(f"{period} has not ended yet")
+    click.echo(f"Closed {period}: {_close_period(period)} client/status groups.")
+
+
+@event.listens_for(SASession, "after_flush")
+def _reopen_touched_periods(session, _flush_ctx):
+    # A change to a bill or receipt in a closed month invalidates that month's snapshot,
+    # so the period is reopened and its figures are computed live again.
+    bill_dates, bill_nos = set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Bill):
+            state = sa_inspect(obj)
+            if obj in session.dirty and not any(
+                    state.attrs[a].history.has_changes() for a in ("bill_date", "amount", "client_id", "bill_no")):
+                continue
+            bill_dates.update(d for d in state.attrs.bill_date.history.sum() if d)
+            bill_nos.update(b for b in state.attrs.bill_no.history.sum() if b)
+        elif isinstance(obj, Receipt):
+            state = sa_inspect(obj)
+            if obj in session.dirty and not any(
+                    state.attrs[a].history.has_changes()
+                    for a in ("bill_no", "receipt_date", "collection_amount", "tds_amt")):
+                continue
+            bill_nos.update(b for b in state.attrs.bill_no.history.sum() if b)
+    if not bill_dates and not bill_nos:
+        return
+    conn = session.connection()
+    closed = {p for (p,) in conn.execute(select(ClosedPeriod.period))}
+    if not closed:
+        return
+    for chunk in _chunks(list(bill_nos)):
+        bill_dates.update(d for (d,) in conn.execute(select(Bill.bill_date).where(Bill.bill_no.in_(chunk))))
+    touched = sorted({d.strftime("%Y-%m") for d in bill_dates} & closed)
+    if touched:
+        conn.execute(delete(PeriodSnapshot).where(PeriodSnapshot.period.in_(touched)))
+        conn.execute(delete(ClosedPeriod).where(ClosedPeriod.period.in_(touched)))
+        app.logger.info("Reopened periods %s after changes to their bills/receipts", ", ".join(touched))
 
 
 # ---------- Dashboard (with pagination) ----------
 @app.route("/dashboard")
+@reporting_read
 def dashboard():
     client_q = request.args.get("client", "").strip()
     status = request.args.get("status", "").strip()
     df_str = request.args.get("from", "").strip()
     dt_str = request.args.get("to", "").strip()
-    dfrom = parse_date(df_str, default=None)
-    dto = parse_date(dt_str, default=None)
+    dfrom = parse_iso_date(df_str, default=None)
+    dto = parse_iso_date(dt_str, default=None)
 
-    bq = Bill.query
-    rq = Receipt.query
-    if client_q:
-        bq = bq.join(Client).filter(Client.name.ilike(f"%{client_q}%"))
-        rq = rq.join(Client).filter(Client.name.ilike(f"%{client_q}%"))
-    if dfrom:
-        bq = bq.filter(Bill.bill_date >= dfrom)
-        rq = rq.filter(Receipt.receipt_date >= dfrom)
-    if dto:
-        bq = bq.filter(Bill.bill_date <= dto)
-        rq = rq.filter(Receipt.receipt_date <= dto)
-
-    bills_df = pd.read_sql(bq.statement, db.engine)
-    receipts_df = pd.read_sql(rq.statement, db.engine)
-
-    clients_map = {c.id: c.name for c in Client.query.all()}
-    if not bills_df.empty:
-        bills_df["client_name"] = bills_df["client_id"].map(clients_map)
-    if not receipts_df.empty:
-        receipts_df["client_name"] = receipts_df["client_id"].map(clients_map)
-
-    pay_by_bill = (
-        receipts_df.dropna(subset=["bill_no"])
-        .groupby("bill_no")["collection_amount"].sum().reset_index()
-        .rename(columns={"collection_amount": "paid_amount"})
-        if not receipts_df.empty else pd.DataFrame(columns=["bill_no", "paid_amount"])
-    )
-    recon = bills_df.merge(pay_by_bill, how="left", on="bill_no")
-    if recon.empty:
-        recon = bills_df.copy()
-        recon["paid_amount"] = 0.0
-    recon["paid_amount"] = recon["paid_amount"].fillna(0.0)
-    recon["balance"] = recon["amount"] - recon["paid_amount"]
-    recon["status"] = recon.apply(
-        lambda r: "Paid" if abs(r["balance"]) < 0.0001 else ("Overpaid" if r["balance"] < 0 else "Pending"), axis=1
-    )
-    if status:
-        recon = recon[recon["status"].str.lower() == status.lower()]
-
-    totals = {
-        "total_bills": float(recon["amount"].sum()) if not recon.empty else 0.0,
-        "total_paid": float(recon["paid_amount"].sum()) if not recon.empty else 0.0,
-        "total_balance": float(recon["balance"].sum()) if not recon.empty else 0.0,
-        "count_pending": int((recon["status"] == "Pending").sum()) if not recon.empty else 0,
-        "count_paid": int((recon["status"] == "Paid").sum()) if not recon.empty else 0,
-        "count_overpaid": int((recon["status"] == "Overpaid").sum()) if not recon.empty else 0,
-    }
+    closed = _closed_period_list()
+    totals = _dashboard_totals(client_q, dfrom, dto, status)
 
-    recon = recon.sort_values(["bill_date", "bill_no"], ascending=[False, True]) if not recon.empty else recon
-
-    # Pagination
+    # Only the visible page of reconciliation rows is fetched
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 15, type=int)
-    total = 0 if recon is None or recon.empty else int(len(recon))
-    pages = max(1, (total + per_page - 1) // per_page)
-    page = min(max(1, page), pages)
-    start = (page - 1) * per_page
-    end = start + per_page
-    rows_page = [] if recon is None or recon.empty else recon.iloc[start:end].to_dict(orient="records")
+    stmt = _recon_select(client_q, dfrom, dto, status)
+    total = sum(totals[f"count_{s}"] for s in ("pending", "paid", "overpaid"))
 
     def _page_url(p):
         args = {
@@ -824,24 +1972,19 @@ def dashboard():
         }
         return url_for("dashboard", **args)
 
-    pagination = {
-        "page": page,
-        "per_page": per_page,
-        "pages": pages,
-        "total": total,
-        "has_prev": page > 1,
-        "has_next": page < pages,
-        "prev_url": _page_url(page - 1) if page > 1 else None,
-        "next_url": _page_url(page + 1) if page < pages else None,
-    }
+    pagination = build_pagination(total, page, per_page, _page_url)
+    rows_page = db.session.execute(
+        stmt.order_by(Bill.bill_date.desc(), Bill.bill_no.asc())
+        .offset((pagination["page"] - 1) * per_page).limit(per_page)
+    ).mappings().all()
 
     return render_template(
         "dashboard.html",
         filters={"client": client_q, "status": status, "dfrom": df_str, "dto": dt_str},
         rows=rows_page,
         totals=totals,
-        clients=Client.query.order_by(Client.name.asc()).all(),
         pagination=pagination,
+        closed_periods=closed,
     )
 
 # ---------- API ----------
@@ -850,57 +1993,570 @@ def api_bills_by_client(client_id: int):
     rows = Bill.query.with_entities(Bill.bill_no).filter(Bill.client_id == client_id).order_by(Bill.bill_no.asc()).all()
     return {"bills": [bn for (bn,) in rows]}
 
+# ---------- API v1 (read-only) ----------
+API_MAX_PER_PAGE = 500
+NDJSON_BATCH = 1000
+
+# Public field name -> column; description/remarks are opt-in (up to 50k chars each)
+API_FIELDS = {
+    "bills": {
+        "id": Bill.id,
+        "bill_no": Bill.bill_no,
+        "bill_date": Bill.bill_date,
+        "client_id": Bill.client_id,
+        "client": Client.name,
+        "amount": Bill.amount,
+        "subject": Bill.Subject,
+        "description": Bill.description,
+        "remarks": Bill.remarks,
+    },
+    "receipts": {
+        "id": Receipt.id,
+        "receipt_ref": Receipt.receipt_ref,
+        "receipt_date": Receipt.receipt_date,
+        "client_id": Receipt.client_id,
+        "client": Client.name,
+        "bill_no": Receipt.bill_no,
+        "tds_amt": Receipt.tds_amt,
+        "collection_amount": Receipt.collection_amount,
+        "utr_details": Receipt.utr_details,
+        "mode": Receipt.mode,
+        "remarks": Receipt.remarks,
+    },
+    "clients": {
+        "id": Client.id,
+        "name": Client.name,
+        "address": Client.address,
+        "gst_no": Client.gst_no,
+        "pan_no": Client.pan_no,
+        "remarks": Client.remarks,
+    },
+    "reconciliation": {
+        name: name for name in
+        ["id", "bill_no", "bill_date", "client_id", "client_name", "amount", "paid_amount", "tds_amount",
+         "balance", "status"]
+    },
+}
+API_DEFAULT_FIELDS = {
+    "bills": ["id", "bill_no", "bill_date", "client_id", "client", "amount", "subject"],
+    "receipts": ["id", "receipt_ref", "receipt_date", "client_id", "client", "bill_no",
+                 "tds_amt", "collection_amount", "utr_details", "mode"],
+    "clients": ["id", "name", "address", "gst_no", "pan_no"],
+    "reconciliation": list(API_FIELDS["reconciliation"]),
+}
+
+
+class ApiError(ValueError):
+    pass
+
+@app.errorhandler(ApiError)
+def _api_error(e):
+    return {"error": str(e)}, 400
+
+
+def _api_fields(kind):
+    requested = (request.args.get("fields", "", type=str) or "").strip()
+    if not requested:
+        return API_DEFAULT_FIELDS[kind]
+    names = [f.strip() for f in requested.split(",") if f.strip()]
+    unknown = [f for f in names if f not in API_FIELDS[kind]]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+def _api_date_range():
+    out = []
+    for name in ("from", "to"):
+        raw = (request.args.get(name, "", type=str) or "").strip()
+        value = parse_iso_date(raw)
+        if raw and value is None:
+            raise ApiError(f"Invalid date for '{name}': {raw}")
+        out.append(value)
+    return out
+
+def _api_value(v):
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    if isinstance(v, float) and v != v:  # NaN from pandas
+        return None
+    return v
+
+def _api_row(fields, values):
+    return {f: _api_value(v) for f, v in zip(fields, values)}
+
+def _wants_ndjson():
+    return (request.args.get("format") == "ndjson"
+            or request.accept_mimetypes.best == "application/x-ndjson")
+
+def _ndjson_response(rows):
+    dumps = app.json.dumps
+    def generate():
+        for row in rows:
+            yield dumps(row) + "\n"
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+def _api_page_args():
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 50, type=int)
+    return page, min(max(1, per_page), API_MAX_PER_PAGE)
+
+def _api_pagination(total, page, per_page):
+    args = request.args.to_dict()
+    def _url(p):
+        return url_for(request.endpoint, **{**args, "page": p})
+    return build_pagination(total, page, per_page, _url)
+
+def _api_list(query, fields):
+    # query selects exactly `fields`, in order
+    if _wants_ndjson():
+        return _ndjson_response(_api_row(fields, r) for r in query.yield_per(NDJSON_BATCH))
+    page, per_page = _api_page_args()
+    pagination = _api_pagination(query.order_by(None).count(), page, per_page)
+    page = pagination["page"]
+    rows = query.offset((page - 1) * per_page).limit(per_page).all()
+    return {"data": [_api_row(fields, r) for r in rows], "pagination": pagination}
+
+def _api_select(kind, fields):
+    cols = API_FIELDS[kind]
+    return db.session.query(*[cols[f].label(f) for f in fields])
+
+
+@app.get("/api/v1/bills")
+def api_v1_bills():
+    fields = _api_fields("bills")
+    dfrom, dto = _api_date_range()
+    q = _api_select("bills", fields).select_from(Bill).join(Client, Bill.client_id == Client.id)
+    q = apply_bill_search(q, (request.args.get("q", "", type=str) or "").strip())
+    client_id = request.args.get("client_id", type=int)
+    if client_id:
+        q = q.filter(Bill.client_id == client_id)
+    if dfrom:
+        q = q.filter(Bill.bill_date >= dfrom)
+    if dto:
+        q = q.filter(Bill.bill_date <= dto)
+    return _api_list(q.order_by(Bill.bill_date.desc(), Bill.id.desc()), fields)
+
+@app.get("/api/v1/receipts")
+def api_v1_receipts():
+    fields = _api_fields("receipts")
+    dfrom, dto = _api_date_range()
+    q = _api_select("receipts", fields).select_from(Receipt).join(Client, Receipt.client_id == Client.id)
+    q = apply_receipt_search(q, (request.args.get("q", "", type=str) or "").strip())
+    client_id = request.args.get("client_id", type=int)
+    if client_id:
+        q = q.filter(Receipt.client_id == client_id)
+    bill_no = (request.args.get("bill_no", "", type=str) or "").strip()
+    if bill_no:
+        q = q.filter(Receipt.bill_no == bill_no)
+    if dfrom:
+        q = q.filter(Receipt.receipt_date >= dfrom)
+    if dto:
+        q = q.filter(Receipt.receipt_date <= dto)
+    return _api_list(q.order_by(Receipt.receipt_date.desc(), Receipt.id.desc()), fields)
+
+@app.get("/api/v1/clients")
+def api_v1_clients():
+    fields = _api_fields("clients")
+    q = _api_select("clients", fields).select_from(Client)
+    qtext = (request.args.get("q", "", type=str) or "").strip()
+    if qtext:
+        q = q.filter(Client.name.ilike(f"%{qtext}%"))
+    return _api_list(q.order_by(Client.name.asc()), fields)
+
+@app.get("/api/v1/reconciliation")
+@reporting_read
+def api_v1_reconciliation():
+    # Same filters and semantics as the dashboard table
+    fields = _api_fields("reconciliation")
+    dfrom, dto = _api_date_range()
+    client_q = (request.args.get("client", "", type=str) or "").strip()
+    status = (request.args.get("status", "", type=str) or "").strip()
+    recon = _recon_select(client_q, dfrom, dto, status).subquery()
+    q = db.session.query(*[recon.c[f] for f in fields])
+    client_id = request.args.get("client_id", type=int)
+    if client_id:
+        q = q.filter(recon.c.client_id == client_id)
+    return _api_list(q.order_by(recon.c.bill_date.desc(), recon.c.bill_no.asc()), fields)
+
+# ---------- API v1 (batched writes) ----------
+BATCH_MAX_ITEMS = 5000
+
+def _batch_items():
+    payload = request.get_json(silent=True)
+    if isinstance(payload, list):
+        payload = {"items": payload}
+    if not isinstance(payload, dict) or not isinstance(payload.get("items"), list):
+        raise ApiError("Expected a JSON list of items or {\"items\": [...]}")
+    items = payload["items"]
+    if not items:
+        raise ApiError("No items to insert")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise ApiError(f"At most {BATCH_MAX_ITEMS} items per batch")
+    # Only a JSON true makes the batch all-or-nothing; "false" as a string must not
+    return items, payload.get("atomic") is True
+
+def _batch_text(item, key):
+    return str(item.get(key) or "").strip()
+
+def _batch_amount(item, key, errors):
+    raw = item.get(key)
+    if raw in (None, ""):
+        return 0.0
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        errors.append(f"{key} must be a number")
+        return 0.0
+    if not math.isfinite(value):
+        errors.append(f"{key} must be a finite number")
+        return 0.0
+    return value
+
+def _batch_client_id(item, clients_by_id, clients_by_name, errors):
+    if item.get("client_id") not in (None, ""):
+        try:
+            cid = int(item["client_id"])
+        except (TypeError, ValueError):
+            cid = None
+        if cid not in clients_by_id:
+            errors.append(f"Unknown client_id: {item['client_id']}")
+        return cid
+    name = _batch_text(item, "client")
+    if not name:
+        errors.append("client_id or client is required")
+        return None
+    cid = clients_by_name.get(name.lower())
+    if cid is None:
+        errors.append(f"Unknown client: {name}")
+    return cid
+
+def _client_lookup():
+    rows = db.session.query(Client.id, Client.name).all()
+    return {cid for cid, _ in rows}, {name.lower(): cid for cid, name in rows}
+
+def _batch_commit(objs, results, atomic):
+    errors = [r for r in results if r["status"] == "error"]
+    if errors and (atomic or not objs):
+        for idx, _ in objs:
+            results[idx] = {"index": idx, "status": "skipped"}
+        return {"created": 0, "errors": len(errors), "results": results}, 422
+    try:
+        db.session.add_all([o for _, o in objs])
+        db.session.flush()
+        for idx, obj in objs:
+            results[idx] = {"index": idx, "status": "created", "id": obj.id}
+        db.session.commit()
+    except IntegrityError as e:
+        # A concurrent writer took one of the keys between validation and insert;
+        # nothing was written, but validation errors are still reported per item
+        db.session.rollback()
+        for idx, _ in objs:
+            results[idx] = {"index": idx, "status": "skipped"}
+        return {"created": 0, "errors": len(errors), "error": str(e.orig), "results": results}, 409
+    return {"created": len(objs), "errors": len(errors), "results": results}, (207 if errors else 201)
+
+
+@app.post("/api/v1/bills/batch")
+def api_v1_bills_batch():
+    items, atomic = _batch_items()
+    clients_by_id, clients_by_name = _client_lookup()
+    taken = _existing(Bill.bill_no, (_batch_text(i, "bill_no") for i in items if isinstance(i, dict)))
+
+    results, objs = [], []
+    for idx, item in enumerate(items):
+        errors = []
+        if not isinstance(item, dict):
+            results.append({"index": idx, "status": "error", "errors": ["Item must be an object"]})
+            continue
+        bill_no = _batch_text(item, "bill_no")
+        if not bill_no:
+            errors.append("bill_no is required")
+        elif bill_no in taken:
+            errors.append(f"Bill No already exists: {bill_no}")
+        bill_date = parse_iso_date(_batch_text(item, "bill_date"))
+        if bill_date is None:
+            errors.append("bill_date is missing or invalid")
+        client_id = _batch_client_id(item, clients_by_id, clients_by_name, errors)
+        amount = _batch_amount(item, "amount", errors)
+        if amount <= 0:
+            errors.append("amount must be positive")
+
+        if errors:
+            results.append({"index": idx, "status": "error", "errors": errors})
+            continue
+        taken.add(bill_no)  # later duplicates in the same batch are rejected
+        results.append({"index": idx, "status": "pending"})
+        objs.append((idx, Bill(
+            bill_no=bill_no, bill_date=bill_date, client_id=client_id, amount=amount,
+            description=_batch_text(item, "description"),
+            remarks=_batch_text(item, "remarks"),
+            Subject=_batch_text(item, "subject"),
+        )))
+    return _batch_commit(objs, results, atomic)
+
+
+@app.post("/api/v1/receipts/batch")
+def api_v1_receipts_batch():
+    items, atomic = _batch_items()
+    clients_by_id, clients_by_name = _client_lookup()
+    wanted = [_batch_text(i, "bill_no") for i in items if isinstance(i, dict)]
+    known_bills = _existing(Bill.bill_no, wanted)
+    paid_bills = _existing(Receipt.bill_no, wanted)  # one receipt per bill
+
+    results, objs = [], []
+    for idx, item in enumerate(items):
+        errors = []
+        if not isinstance(item, dict):
+            results.append({"index": idx, "status": "error", "errors": ["Item must be an object"]})
+            continue
+        bill_no = _batch_text(item, "bill_no")
+        if not bill_no:
+            errors.append("bill_no is required")
+        elif bill_no not in known_bills:
+            errors.append(f"Bill No does not exist: {bill_no}")
+        elif bill_no in paid_bills:
+            errors.append(f"A receipt already exists for Bill No {bill_no}")
+        receipt_date = parse_iso_date(_batch_text(item, "receipt_date"))
+        if receipt_date is None:
+            errors.append("receipt_date is missing or invalid")
+        client_id = _batch_client_id(item, clients_by_id, clients_by_name, errors)
+        tds_amt = _batch_amount(item, "tds_amt", errors)
+        paid_amount = _batch_amount(item, "paid_amount", errors)
+        if tds_amt + paid_amount <= 0:
+            errors.append("tds_amt + paid_amount must be positive")
+
+        if errors:
+            results.append({"index": idx, "status": "error", "errors": errors})
+            continue
+        paid_bills.add(bill_no)
+        results.append({"index": idx, "status": "pending"})
+        objs.append((idx, Receipt(
+            receipt_ref=_batch_text(item, "receipt_ref"), receipt_date=receipt_date,
+            client_id=client_id, bill_no=bill_no, tds_amt=tds_amt,
+            collection_amount=tds_amt + paid_amount,
+            utr_details=_batch_text(item, "utr_details"),
+            mode=_batch_text(item, "mode"),
+            remarks=_batch_text(item, "remarks"),
+        )))
+    return _batch_commit(objs, results, atomic)
+
 # ---------- Export ----------
+RECON_EXPORT_COLUMNS = ["id", "bill_no", "bill_date", "client_id", "amount", "description", "remarks",
+                        "Subject", "client_name", "paid_amount", "balance", "status"]
+
 @app.route("/export/reconciliation.<fmt>")
+@reporting_read
 def export_reconciliation(fmt):
-    bq = Bill.query
-    rq = Receipt.query
-    bills_df = pd.read_sql(bq.statement, db.engine)
-    receipts_df = pd.read_sql(rq.statement, db.engine)
-    clients_map = {c.id: c.name for c in Client.query.all()}
-    if not bills_df.empty:
-        bills_df["client_name"] = bills_df["client_id"].map(clients_map)
-    if not receipts_df.empty:
-        receipts_df["client_name"] = receipts_df["client_id"].map(clients_map)
-    pay_by_bill = (
-        receipts_df.dropna(subset=["bill_no"])
-        .groupby("bill_no")["collection_amount"].sum().reset_index()
-        .rename(columns={"collection_amount": "paid_amount"})
-        if not receipts_df.empty else pd.DataFrame(columns=["bill_no","paid_amount"])
-    )
-    recon = bills_df.merge(pay_by_bill, how="left", on="bill_no")
-    if recon.empty:
-        recon = bills_df.copy()
-        recon["paid_amount"] = 0.0
-    recon["paid_amount"] = recon["paid_amount"].fillna(0.0)
-    recon["balance"] = recon["amount"] - recon["paid_amount"]
-    recon["status"] = recon.apply(
-        lambda r: "Paid" if abs(r["balance"]) < 0.0001 else ("Overpaid" if r["balance"] < 0 else "Pending"), axis=1
-    )
-
-    output = io.BytesIO()
-    recon.columns = [c[:1].upper() + c[1:] if isinstance(c, str) else c for c in recon.columns]
-    if fmt == "csv":
-        recon.to_csv(output, index=False)
-        output.seek(0)
-        return send_file(output, mimetype="text/csv", as_attachment=True, download_name="reconciliation.csv")
-    elif fmt == "xlsx":
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            recon.to_excel(writer, sheet_name="Reconciliation", index=False)
-        output.seek(0)
-        return send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name="reconciliation.xlsx"
-        )
-    else:
-        flash("Unsupported export format.", "danger")
-        return redirect(url_for("dashboard"))
+    recon = _recon_select(details=True).subquery()
+    stmt = select(*[recon.c[c].label(c[:1].upper() + c[1:]) for c in RECON_EXPORT_COLUMNS]
+                  ).order_by(recon.c.bill_date.desc(), recon.c.bill_no.asc())
+    return _send_export(stmt, fmt, "reconciliation", sheet_name="Reconciliation")
+
+# ---------- Database maintenance ----------
+# Every task uses its own short-lived SQLite connection. In WAL mode backups, checks and
+# ANALYZE only take read snapshots, and incremental vacuum frees pages in small batches,
+# so request traffic keeps flowing while they run.
+BACKUP_DIR = os.environ.get("BACKUP_DIR", os.path.join(app.instance_path, "backups"))
+BACKUP_KEEP = int(os.environ.get("BACKUP_KEEP", "14"))
+BACKUP_PAGES = int(os.environ.get("BACKUP_PAGES", "-1"))  # pages per backup step; -1 = all in one step
+BACKUP_SLEEP = float(os.environ.get("BACKUP_SLEEP", "0.05"))
+VACUUM_STEP_PAGES = 256
+ANALYSIS_LIMIT = 1000
+MAINTENANCE_INTERVAL_HOURS = float(os.environ.get("MAINTENANCE_INTERVAL_HOURS", "0"))
+
+def _sqlite_path():
+    url = db.engine.url
+    return url.database if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:") else None
+
+def _maintenance_connection(path: str):
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+def _db_size(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):.2f} MB"
+
+def _backup(path: str, dest=None, pages: int = BACKUP_PAGES, sleep: float = BACKUP_SLEEP):
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    dest = dest or os.path.join(BACKUP_DIR, f"data-{datetime.now():%Y%m%d-%H%M%S}.db")
+    src, dst = _maintenance_connection(path), sqlite3.connect(dest)
+    try:
+        src.backup(dst, pages=pages, sleep=sleep)
+        verified = dst.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+    finally:
+        dst.close()
+        src.close()
+    pruned = 0
+    if os.path.dirname(os.path.abspath(dest)) == os.path.abspath(BACKUP_DIR):
+        old = sorted(f for f in os.listdir(BACKUP_DIR) if f.startswith("data-") and f.endswith(".db"))
+        for name in old[:-BACKUP_KEEP] if BACKUP_KEEP > 0 else []:
+            os.remove(os.path.join(BACKUP_DIR, name))
+            pruned += 1
+    return {"file": dest, "backup_size": os.path.getsize(dest), "verified": verified, "pruned": pruned}
+
+def _vacuum(path: str, enable: bool = False):
+    conn = _maintenance_connection(path)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            if not enable:
+                return {"skipped": "auto_vacuum is not INCREMENTAL (run once with --enable-incremental)"}
+            # One-off full rebuild; holds the write lock for its duration
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        freed = 0
+        while True:
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free:
+                break
+            # execute() would stop after the first freed page; executescript() runs the pragma to completion
+            conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES});")
+            freed += min(free, VACUUM_STEP_PAGES)
+            time.sleep(0.01)  # let waiting writers in between batches
+        conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        return {"freed_pages": freed}
+    finally:
+        conn.close()
+
+def _analyze(path: str, full: bool = False):
+    conn = _maintenance_connection(path)
+    try:
+        has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        # PRAGMA optimize only refreshes statistics that exist, so the first run needs ANALYZE
+        mode = "ANALYZE" if full or not has_stats else "PRAGMA optimize"
+        conn.execute(mode)
+        return {"ran": mode}
+    finally:
+        conn.close()
+
+def _check(path: str, full: bool = False):
+    conn = _maintenance_connection(path)
+    try:
+        rows = [r[0] for r in conn.execute("PRAGMA integrity_check" if full else "PRAGMA quick_check")]
+        problems = [] if rows == ["ok"] else rows
+        problems += [f"foreign key: {r[0]} row {r[1]} -> {r[2]}" for r in conn.execute("PRAGMA foreign_key_check")]
+        return {"ok": not problems, "problems": problems[:20]}
+    finally:
+        conn.close()
+
+MAINTENANCE_TASKS = {"backup": _backup, "check": _check, "analyze": _analyze, "vacuum": _vacuum}
+
+def run_maintenance(name: str, **options) -> dict:
+    path = _sqlite_path()
+    if path is None:
+        raise RuntimeError("Database maintenance needs a file-based SQLite database")
+    before, started = _db_size(path), time.perf_counter()
+    report = {"task": name, **MAINTENANCE_TASKS[name](path, **options)}
+    report.update(seconds=round(time.perf_counter() - started, 3), size_before=before, size_after=_db_size(path))
+    app.logger.info("Maintenance: %s", _describe_maintenance(report))
+    return report
+
+def _describe_maintenance(report: dict) -> str:
+    change = report["size_after"] - report["size_before"]
+    extras = ", ".join(f"{k}={_mb(v) if k == 'backup_size' else v}" for k, v in report.items()
+                       if k not in ("task", "seconds", "size_before", "size_after") and v != [])
+    return (f"{report['task']}: {report['seconds']:.2f}s, database {_mb(report['size_before'])} -> "
+            f"{_mb(report['size_after'])} ({change / (1024 * 1024):+.2f} MB)" + (f", {extras}" if extras else ""))
+
+def _maintenance_cycle():
+    for name in MAINTENANCE_TASKS:
+        report = run_maintenance(name)
+        if name == "check" and not report["ok"]:
+            app.logger.error("Integrity check failed: %s", "; ".join(report["problems"]))
+
+def _maintenance_due(stamp: str) -> bool:
+    try:
+        return time.time() - os.path.getmtime(stamp) >= MAINTENANCE_INTERVAL_HOURS * 3600 * 0.9
+    except OSError:
+        return True
+
+def _maintenance_loop():
+    # Each worker runs this loop; the file lock and stamp make one of them do the work per interval
+    stamp = os.path.join(app.instance_path, "maintenance.stamp")
+    while True:
+        time.sleep(min(MAINTENANCE_INTERVAL_HOURS * 3600, 3600))
+        with _file_lock(os.path.join(app.instance_path, "maintenance.lock"), blocking=False) as held:
+            if not held or not _maintenance_due(stamp):
+                continue
+            try:
+                with app.app_context():
+                    _maintenance_cycle()
+            except Exception:
+                app.logger.exception("Scheduled maintenance failed")
+            with open(stamp, "w") as f:
+                f.write(datetime.now().isoformat())
+
+def start_maintenance_thread():
+    # Called from gunicorn's post_fork and wsgi.main(); off unless MAINTENANCE_INTERVAL_HOURS > 0
+    if MAINTENANCE_INTERVAL_HOURS <= 0:
+        return None
+    with app.app_context():
+        if _sqlite_path() is None:
+            return None
+    thread = threading.Thread(target=_maintenance_loop, name="db-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+
+@app.cli.group("maint")
+def maint_cli():
+    """SQLite maintenance: backup, vacuum, analyze and integrity checks."""
+
+def _echo_maintenance(name: str, **options):
+    try:
+        report = run_maintenance(name, **options)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(_describe_maintenance(report))
+    return report
+
+@maint_cli.command("backup")
+@click.option("--dest", type=click.Path(dir_okay=False), help="Backup file (default: a dated file in BACKUP_DIR).")
+@click.option("--pages", default=BACKUP_PAGES, show_default=True, help="Pages copied per step; -1 copies all at once.")
+@click.option("--sleep", default=BACKUP_SLEEP, show_default=True, help="Seconds to pause between steps.")
+def maint_backup(dest, pages, sleep):
+    """Online backup through the SQLite backup API."""
+    _echo_maintenance("backup", dest=dest, pages=pages, sleep=sleep)
+
+@maint_cli.command("vacuum")
+@click.option("--enable-incremental", "enable", is_flag=True,
+              help="Switch the database to incremental auto-vacuum first (one full VACUUM; blocks writes).")
+def maint_vacuum(enable):
+    """Return free pages to the filesystem in small batches."""
+    _echo_maintenance("vacuum", enable=enable)
+
+@maint_cli.command("analyze")
+@click.option("--full", is_flag=True, help="Run ANALYZE instead of PRAGMA optimize.")
+def maint_analyze(full):
+    """Refresh query planner statistics."""
+    _echo_maintenance("analyze", full=full)
+
+@maint_cli.command("check")
+@click.option("--full", is_flag=True, help="PRAGMA integrity_check instead of quick_check.")
+def maint_check(full):
+    """Check the database file for corruption and broken foreign keys."""
+    report = _echo_maintenance("check", full=full)
+    if not report["ok"]:
+        raise click.ClickException("; ".join(report["problems"]))
+
+@maint_cli.command("all")
+def maint_all():
+    """Backup, check, analyze and vacuum, as the scheduled task does."""
+    for name in MAINTENANCE_TASKS:
+        report = _echo_maintenance(name)
+        if name == "check" and not report["ok"]:
+            raise click.ClickException("; ".join(report["problems"]))
 
 # ---------- Bootstrap DB ----------
 with app.app_context():
     db.create_all()
 
 if __name__ == "__main__":
+    # Development server only; production runs through wsgi.py
     app.run(debug=True)
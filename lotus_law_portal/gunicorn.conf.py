@@ -0,0 +1,41 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+# Every setting can be overridden from the environment (see README.txt).
+import multiprocessing
+import os
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '8000')}"
+
+# Workers x threads: SQLite allows one writer at a time, so a few processes with
+# several threads each serve reads well without piling up on the write lock.
+workers = int(os.environ.get("WEB_WORKERS", min(4, multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.environ.get("WEB_THREADS", "8"))
+worker_class = "gthread"
+
+# Load the app (pandas, models, templates) once in the master and fork it, so
+# workers share those pages copy-on-write and start instantly on reload.
+preload_app = True
+
+# Long import/export requests must not be killed mid-transaction.
+timeout = int(os.environ.get("WEB_TIMEOUT", "300"))
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", "60"))
+keepalive = int(os.environ.get("WEB_KEEPALIVE", "5"))
+
+# Recycle workers now and then to cap pandas memory growth
+max_requests = int(os.environ.get("WEB_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("WEB_MAX_REQUESTS_JITTER", "100"))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("WEB_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    # The master opened pooled connections while preloading (db.create_all);
+    # a forked worker must never reuse them, so drop them without closing.
+    from app import app, db, start_maintenance_thread
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    # Threads do not survive fork, so each worker starts its own; a file lock
+    # lets only one of them run the scheduled maintenance at a time.
+    start_maintenance_thread()
@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The app binds its database at import time, so point it at a scratch file first
+_DB_DIR = tempfile.mkdtemp(prefix="lotus-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+from app import app as flask_app, db  # noqa: E402
+
+
+@pytest.fixture()
+def app():
+    flask_app.config.update(TESTING=True)
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    # Data versions restart with the fresh database, so rendered fragments must go too
+    app_module._fragments.clear()
+    yield flask_app
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
@@ -0,0 +1,117 @@
+from datetime import date
+
+from app import Bill, Client, Receipt, db
+
+
+def _seed(app):
+    with app.app_context():
+        client = Client(name="ACME LTD")
+        db.session.add(client)
+        db.session.flush()
+        db.session.add_all([
+            Bill(bill_no="A/1", bill_date=date(2024, 2, 1), client_id=client.id, amount=100),
+            Bill(bill_no="A/2", bill_date=date(2024, 2, 10), client_id=client.id, amount=200),
+            Bill(bill_no="A/3", bill_date=date(2024, 3, 1), client_id=client.id, amount=300),
+        ])
+        db.session.commit()
+        return client.id
+
+
+def _bill_nos(resp):
+    assert resp.status_code == 200, resp.get_json()
+    return sorted(b["bill_no"] for b in resp.get_json()["data"])
+
+
+def test_date_range_filters_read_iso_dates(app, client):
+    _seed(app)
+    # 2024-02-03 is 3 February; day-first parsing would read it as 2 March
+    assert _bill_nos(client.get("/api/v1/bills?from=2024-02-03")) == ["A/2", "A/3"]
+    assert _bill_nos(client.get("/api/v1/bills?to=2024-02-03")) == ["A/1"]
+
+
+def test_date_range_still_accepts_day_first(app, client):
+    _seed(app)
+    assert _bill_nos(client.get("/api/v1/bills?from=03-02-2024")) == ["A/2", "A/3"]
+
+
+def test_invalid_date_is_rejected(app, client):
+    resp = client.get("/api/v1/bills?from=not-a-date")
+    assert resp.status_code == 400
+
+
+def test_bill_form_stores_iso_date(app, client):
+    client_id = _seed(app)
+    client.post("/bills", data={"bill_no": "F/1", "bill_date": "2024-02-03",
+                                "client_id": client_id, "amount": "50"})
+    with app.app_context():
+        assert Bill.query.filter_by(bill_no="F/1").one().bill_date == date(2024, 2, 3)
+
+
+def test_batch_bills_store_iso_dates(app, client):
+    client_id = _seed(app)
+    resp = client.post("/api/v1/bills/batch", json=[
+        {"bill_no": "B/1", "bill_date": "2024-02-03", "client_id": client_id, "amount": 10},
+        {"bill_no": "B/2", "bill_date": "03-02-2024", "client_id": client_id, "amount": 10},
+    ])
+    assert resp.status_code == 201, resp.get_json()
+    with app.app_context():
+        dates = {b.bill_no: b.bill_date for b in Bill.query.filter(Bill.bill_no.in_(["B/1", "B/2"]))}
+    assert dates == {"B/1": date(2024, 2, 3), "B/2": date(2024, 2, 3)}
+
+
+def test_batch_receipts_store_iso_dates(app, client):
+    client_id = _seed(app)
+    resp = client.post("/api/v1/receipts/batch", json=[
+        {"bill_no": "A/1", "receipt_date": "2024-02-03", "client_id": client_id, "paid_amount": 100},
+    ])
+    assert resp.status_code == 201, resp.get_json()
+    with app.app_context():
+        assert Receipt.query.filter_by(bill_no="A/1").one().receipt_date == date(2024, 2, 3)
+
+
+def test_ndjson_stream_is_gzipped_in_blocks(app, client):
+    import gzip
+    import json
+
+    _seed(app)
+    resp = client.get("/api/v1/bills?format=ndjson", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    lines = gzip.decompress(resp.data).decode().splitlines()
+    assert sorted(json.loads(line)["bill_no"] for line in lines) == ["A/1", "A/2", "A/3"]
+
+
+def test_batch_rejects_non_finite_amounts_per_item(app, client):
+    client_id = _seed(app)
+    resp = client.post("/api/v1/bills/batch", json=[
+        {"bill_no": "N/1", "bill_date": "2024-02-03", "client_id": client_id, "amount": "nan"},
+        {"bill_no": "N/2", "bill_date": "2024-02-03", "client_id": client_id, "amount": "inf"},
+        {"bill_no": "N/3", "bill_date": "2024-02-03", "client_id": client_id, "amount": 10},
+    ])
+    assert resp.status_code == 207, resp.get_json()
+    body = resp.get_json()
+    assert [r["status"] for r in body["results"]] == ["error", "error", "created"]
+    assert "amount must be a finite number" in body["results"][0]["errors"]
+
+
+def test_batch_atomic_needs_a_json_true(app, client):
+    client_id = _seed(app)
+    resp = client.post("/api/v1/bills/batch", json={"atomic": "false", "items": [
+        {"bill_no": "", "bill_date": "2024-02-03", "client_id": client_id, "amount": 10},
+        {"bill_no": "K/1", "bill_date": "2024-02-03", "client_id": client_id, "amount": 10},
+    ]})
+    assert resp.status_code == 207
+    assert resp.get_json()["created"] == 1
+
+
+def test_batch_conflict_at_insert_still_reports_items(app, client, monkeypatch):
+    import app as app_module
+
+    client_id = _seed(app)
+    # Validation misses the existing bill, as if another writer inserted it meanwhile
+    monkeypatch.setattr(app_module, "_existing", lambda column, values: set())
+    resp = client.post("/api/v1/bills/batch", json=[
+        {"bill_no": "A/1", "bill_date": "2024-02-03", "client_id": client_id, "amount": 10},
+        {"bill_no": "", "bill_date": "2024-02-03", "client_id": client_id, "amount": 10},
+    ])
+    assert resp.status_code == 409
+    assert [r["status"] for r in resp.get_json()["results"]] == ["skipped", "error"]
@@ -0,0 +1,41 @@
+import io
+from datetime import date
+
+import openpyxl
+import pandas as pd
+import pyarrow.parquet as pq
+
+from app import Bill, Client, Receipt, db
+
+
+def _seed(app):
+    with app.app_context():
+        client = Client(name="ACME LTD")
+        db.session.add(client)
+        db.session.flush()
+        db.session.add_all([
+            Bill(bill_no="E/1", bill_date=date(2024, 1, 10), client_id=client.id, amount=100),
+            Bill(bill_no="E/2", bill_date=date(2024, 1, 20), client_id=client.id, amount=50),
+            Receipt(bill_no="E/1", receipt_date=date(2024, 1, 25), client_id=client.id, collection_amount=100),
+        ])
+        db.session.commit()
+
+
+def test_reconciliation_exports_agree_across_formats(app, client):
+    _seed(app)
+    csv = pd.read_csv(io.BytesIO(client.get("/export/reconciliation.csv").data))
+    parquet = pq.read_table(io.BytesIO(client.get("/export/reconciliation.parquet").data)).to_pandas()
+    assert list(csv.columns) == list(parquet.columns)
+    assert dict(zip(csv["Bill_no"], csv["Status"])) == {"E/1": "Paid", "E/2": "Pending"}
+    assert dict(zip(parquet["Bill_no"], parquet["Status"])) == {"E/1": "Paid", "E/2": "Pending"}
+
+
+def test_reconciliation_xlsx_keeps_its_sheet_name(app, client):
+    _seed(app)
+    book = openpyxl.load_workbook(io.BytesIO(client.get("/export/reconciliation.xlsx").data))
+    assert book.sheetnames == ["Reconciliation"]
+
+
+def test_unknown_export_format_redirects(app, client):
+    resp = client.get("/export/reconciliation.pdf")
+    assert resp.status_code == 302
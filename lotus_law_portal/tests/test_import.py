@@ -0,0 +1,176 @@
+import io
+
+import pandas as pd
+
+from app import Bill, Client, Receipt, db
+
+LEDGER_CSV = (
+    "Client,Bill No,Bill Date,Amount,Receipt Date,Paid,TDS\n"
+    "ACME LTD,T/001,2024-02-03,1000,2024-02-10,900,100\n"
+    "ACME LTD,T/002,2024-03-05,500,,,\n"
+)
+
+
+def _upload(client, data=LEDGER_CSV, name="ledger.csv"):
+    return client.post("/import", data={"file": (io.BytesIO(data.encode()), name)},
+                       content_type="multipart/form-data")
+
+
+def test_import_page_renders(client):
+    resp = client.get("/import")
+    assert resp.status_code == 200
+    assert b"Upload & Preview" in resp.data
+    assert b"Confirm Import" not in resp.data
+
+
+def test_upload_previews_then_confirm_imports(app, client):
+    resp = _upload(client)
+    assert resp.status_code == 200
+    assert b"Confirm Import" in resp.data
+    assert b"T/001" in resp.data
+
+    resp = client.post("/import", data={"confirm": "1"})
+    assert resp.status_code == 302
+
+    with app.app_context():
+        assert Client.query.filter_by(name="ACME LTD").count() == 1
+        bill = Bill.query.filter_by(bill_no="T/001").one()
+        assert bill.bill_date.isoformat() == "2024-02-03"
+        assert Bill.query.count() == 2
+        receipt = Receipt.query.filter_by(bill_no="T/001").one()
+        assert receipt.collection_amount == 1000
+
+
+def test_confirm_without_upload_redirects(client):
+    resp = client.post("/import", data={"confirm": "1"})
+    assert resp.status_code == 302
+    assert resp.location.endswith("/import")
+
+
+def test_unreadable_receipt_date_keeps_bill_and_says_so(app, client):
+    data = (
+        "Client,Bill No,Bill Date,Amount,Receipt Date,Paid,TDS\n"
+        "ACME LTD,T/010,2024-02-03,1000,not a date,900,100\n"
+    )
+    _upload(client, data, "bad_receipt.csv")
+    resp = client.post("/import", data={"confirm": "1"}, follow_redirects=True)
+    assert b"Bill imported but receipt not recorded for 1 row(s) with unreadable Receipt Date" in resp.data
+    assert b"Skipped 1 row(s)" not in resp.data
+    with app.app_context():
+        assert Bill.query.filter_by(bill_no="T/010").count() == 1
+        assert Receipt.query.filter_by(bill_no="T/010").count() == 0
+
+
+def test_deleted_bill_is_restored_by_reimport(app, client):
+    _upload(client)
+    client.post("/import", data={"confirm": "1"})
+    with app.app_context():
+        bill_id = Bill.query.filter_by(bill_no="T/002").one().id
+    client.post(f"/delete/bill/{bill_id}")
+
+    # The same file is accepted again and only the deleted bill is recreated
+    resp = _upload(client)
+    assert b"Confirm Import" in resp.data
+    resp = client.post("/import", data={"confirm": "1"}, follow_redirects=True)
+    assert b"1 bills" in resp.data
+    with app.app_context():
+        assert Bill.query.filter_by(bill_no="T/002").count() == 1
+        assert Bill.query.count() == 2
+
+
+def test_deleted_receipt_is_restored_by_receipts_reimport(app, client):
+    _upload(client)
+    client.post("/import", data={"confirm": "1"})
+    receipts_csv = "Client,Bill No,Receipt Date,Paid,TDS\nACME LTD,T/001,2024-02-10,900,100\n"
+    client.post("/import/receipts/now", data={"file": (io.BytesIO(receipts_csv.encode()), "r.csv")},
+                content_type="multipart/form-data")
+    with app.app_context():
+        receipt_id = Receipt.query.filter_by(bill_no="T/001").one().id
+    client.post(f"/delete/receipt/{receipt_id}")
+    client.post("/import/receipts/now", data={"file": (io.BytesIO(receipts_csv.encode()), "r.csv")},
+                content_type="multipart/form-data")
+    with app.app_context():
+        assert Receipt.query.filter_by(bill_no="T/001").count() == 1
+
+
+def _workbook(**sheets):
+    out = io.BytesIO()
+    with pd.ExcelWriter(out, engine="openpyxl") as writer:
+        for name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
+    return out.getvalue()
+
+
+def _post_file(client, url, data, name):
+    return client.post(url, data={"file": (io.BytesIO(data), name)}, content_type="multipart/form-data",
+                       follow_redirects=True)
+
+
+def test_multi_sheet_clients_keep_fields_their_sheet_lacks(app, client):
+    with app.app_context():
+        db.session.add(Client(name="Beta", address="12 Road"))
+        db.session.commit()
+    data = _workbook(A=pd.DataFrame({"Client": ["Alpha"], "Address": ["1 Street"]}),
+                     B=pd.DataFrame({"Client": ["Beta"]}))
+    resp = _post_file(client, "/import/clients/now", data, "clients.xlsx")
+    assert b"Created 1, updated 1" in resp.data
+    with app.app_context():
+        assert Client.query.filter_by(name="Beta").one().address == "12 Road"
+        alpha = Client.query.filter_by(name="Alpha").one()
+        assert alpha.address == "1 Street"
+        assert alpha.gst_no == ""
+
+
+def test_multi_sheet_bills_do_not_store_nan(app, client):
+    data = _workbook(
+        Jan=pd.DataFrame({"Bill No": ["W/1"], "Bill Date": ["2024-01-05"], "Client": ["ACME LTD"],
+                          "Amount": [100], "Description": ["Retainer"]}),
+        Feb=pd.DataFrame({"Bill No": ["W/2"], "Bill Date": ["2024-02-05"], "Client": ["ACME LTD"],
+                          "Amount": [200]}))
+    resp = _post_file(client, "/import/bills/now", data, "bills.xlsx")
+    assert b"Created 2" in resp.data
+    with app.app_context():
+        assert Bill.query.filter_by(bill_no="W/1").one().description == "Retainer"
+        assert Bill.query.filter_by(bill_no="W/2").one().description == ""
+
+
+def test_reupload_with_a_blank_cell_keeps_unchanged_rows(app, client):
+    # The blank TDS turns the column into floats (10 -> 10.0); the old rows must still match
+    first = ("Client,Bill No,Receipt Date,Paid,TDS\n"
+             "ACME LTD,T/001,2024-02-10,90,10\nACME LTD,T/002,2024-03-10,40,10\n")
+    second = first + "ACME LTD,T/003,2024-03-12,50,\n"
+    with app.app_context():
+        db.session.add(Client(name="ACME LTD"))
+        db.session.commit()
+    _post_file(client, "/import/receipts/now", first.encode(), "r1.csv")
+    resp = _post_file(client, "/import/receipts/now", second.encode(), "r2.csv")
+    assert b"Created 1, updated 0, unchanged 2" in resp.data
+
+
+def test_deleting_a_record_only_forgets_the_uploads_that_held_it(app, client):
+    _upload(client)
+    client.post("/import", data={"confirm": "1"})
+    other = "Client,Bill No,Bill Date,Amount\nACME LTD,T/900,2024-04-01,10\n"
+    _upload(client, other, "other.csv")
+    client.post("/import", data={"confirm": "1"})
+    with app.app_context():
+        bill_id = Bill.query.filter_by(bill_no="T/900").one().id
+    client.post(f"/delete/bill/{bill_id}")
+
+    resp = _post_file(client, "/import", LEDGER_CSV.encode(), "ledger.csv")
+    assert b"already imported" in resp.data
+    resp = _upload(client, other, "other.csv")
+    assert b"Confirm Import" in resp.data
+
+
+def test_confirm_refuses_a_forged_upload_reference(app, client, tmp_path):
+    outside = tmp_path / "evil.pkl"
+    pd.to_pickle({"": pd.DataFrame()}, outside)
+    for forged in ({"digest": str(outside)[:-4], "ext": ".pkl"},
+                   {"digest": "../" + "a" * 61, "ext": ".csv"},
+                   {"digest": "a" * 64, "ext": "/../../evil.pkl"}):
+        with client.session_transaction() as sess:
+            sess["import_temp"] = {**forged, "filename": "x.csv"}
+        resp = client.post("/import", data={"confirm": "1"}, follow_redirects=True)
+        assert b"No file to import" in resp.data
+    assert outside.exists()
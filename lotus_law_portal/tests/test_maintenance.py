@@ -0,0 +1,72 @@
+import sqlite3
+from datetime import date
+
+from sqlalchemy import text
+
+import app as app_module
+from app import Bill, Client, db, run_maintenance
+
+
+def _seed(app, n=50):
+    with app.app_context():
+        client = Client(name="ACME LTD")
+        db.session.add(client)
+        db.session.flush()
+        db.session.add_all(Bill(bill_no=f"M/{i}", bill_date=date(2024, 1, 1), client_id=client.id,
+                                amount=i + 1, description="x" * 2000) for i in range(n))
+        db.session.commit()
+
+
+def test_backup_copies_verifies_and_prunes(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, "BACKUP_DIR", str(tmp_path))
+    monkeypatch.setattr(app_module, "BACKUP_KEEP", 1)
+    (tmp_path / "data-20000101-000000.db").write_bytes(b"")
+    _seed(app)
+    with app.app_context():
+        report = run_maintenance("backup")
+    assert report["verified"] is True
+    assert report["pruned"] == 1
+    assert [str(p) for p in tmp_path.iterdir()] == [report["file"]]  # older copy pruned
+    copy = sqlite3.connect(report["file"])
+    try:
+        assert copy.execute("SELECT count(*) FROM bill").fetchone()[0] == 50
+    finally:
+        copy.close()
+
+
+def test_check_reports_broken_references(app):
+    _seed(app, n=1)
+    with app.app_context():
+        report = run_maintenance("check")
+        assert report["ok"] is True and report["problems"] == []
+        # Foreign keys are not enforced on write, so the check is what finds orphans
+        db.session.execute(text("INSERT INTO bill (bill_no, bill_date, client_id, amount) "
+                                "VALUES ('M/orphan', '2024-01-01', 999, 1)"))
+        db.session.commit()
+        report = run_maintenance("check", full=True)
+    assert report["ok"] is False
+    assert any(p.startswith("foreign key: bill") for p in report["problems"])
+
+
+def test_analyze_then_optimize(app):
+    _seed(app, n=5)
+    with app.app_context():
+        assert run_maintenance("analyze")["ran"] == "ANALYZE"
+        assert run_maintenance("analyze")["ran"] == "PRAGMA optimize"
+
+
+def test_vacuum_needs_enabling_then_frees_pages(app):
+    _seed(app)
+    with app.app_context():
+        assert "skipped" in run_maintenance("vacuum")
+        run_maintenance("vacuum", enable=True)
+        Bill.query.delete()
+        db.session.commit()
+        report = run_maintenance("vacuum")
+    assert report["freed_pages"] > 0
+
+
+def test_cli_check(app):
+    result = app.test_cli_runner().invoke(args=["maint", "check"])
+    assert result.exit_code == 0, result.output
+    assert "check:" in result.output
@@ -0,0 +1,59 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from app import Bill, Client, DataVersion, db
+
+
+def _seed(app, description=""):
+    with app.app_context():
+        client = Client(name="ACME LTD")
+        db.session.add(client)
+        db.session.flush()
+        bill = Bill(bill_no="P/1", bill_date=date(2024, 2, 1), client_id=client.id, amount=100,
+                    description=description)
+        db.session.add(bill)
+        db.session.commit()
+        return client.id, bill.id
+
+
+def test_client_picker_follows_the_data_version(app, client):
+    client_id, _ = _seed(app)
+    assert b"ACME LTD" in client.get("/bills").data  # renders and caches the picker
+
+    client.post(f"/clients/{client_id}/edit", data={"name": "ACME HOLDINGS"})
+    page = client.get("/bills").data
+    assert b"ACME HOLDINGS" in page
+    client.post("/clients", data={"name": "Beta"})
+    assert b"Beta" in client.get("/bills").data
+    with app.app_context():
+        assert db.session.get(DataVersion, "client").version == 3
+
+
+def test_picker_is_rerendered_when_another_worker_bumps_the_version(app, client):
+    _seed(app)
+    client.get("/bills")
+    with app.app_context():
+        # Raw SQL skips the ORM, so no version is bumped and the cached picker is served
+        db.session.execute(text("INSERT INTO client (name) VALUES ('Gamma')"))
+        db.session.commit()
+    assert b"Gamma" not in client.get("/bills").data
+    with app.app_context():
+        # What another worker's write leaves behind: a higher version in the shared table
+        db.session.execute(text("UPDATE data_version SET version = version + 1 WHERE name = 'client'"))
+        db.session.commit()
+    assert b"Gamma" in client.get("/bills").data
+
+
+def test_long_notes_are_previewed_and_served_in_full(app, client):
+    text = "Retainer for the appeal before the High Court, March hearing"
+    _, bill_id = _seed(app, description=text)
+    page = client.get("/bills").data.decode()
+    assert text not in page
+    assert text[:25] + "…" in page
+
+    resp = client.get(f"/text/bill/{bill_id}/description")
+    assert resp.status_code == 200
+    assert resp.get_json() == {"text": text}
+    assert client.get(f"/text/bill/{bill_id}/amount").status_code == 404
+    assert client.get("/text/bill/999/description").status_code == 404
@@ -0,0 +1,53 @@
+from datetime import date
+
+from app import Bill, Client, Receipt, _close_period, _dashboard_totals, _periods_covered, db
+
+
+def _seed(app):
+    with app.app_context():
+        client = Client(name="ACME LTD")
+        db.session.add(client)
+        db.session.flush()
+        db.session.add_all([
+            Bill(bill_no="J/1", bill_date=date(2024, 1, 10), client_id=client.id, amount=100),
+            Bill(bill_no="J/2", bill_date=date(2024, 1, 20), client_id=client.id, amount=50),
+            Receipt(bill_no="J/1", receipt_date=date(2024, 3, 5), client_id=client.id, collection_amount=100),
+            Receipt(bill_no="J/2", receipt_date=date(2024, 1, 25), client_id=client.id, collection_amount=50),
+        ])
+        db.session.commit()
+
+
+def _totals(app, dfrom, dto):
+    with app.app_context():
+        return _dashboard_totals("", dfrom, dto, "")
+
+
+def test_closing_a_month_does_not_change_the_totals(app):
+    _seed(app)
+    ranges = [(None, None), (date(2024, 1, 1), date(2024, 1, 31)), (date(2024, 1, 1), date(2024, 3, 31)),
+              (date(2024, 1, 15), None)]
+    before = {r: _totals(app, *r) for r in ranges}
+    with app.app_context():
+        _close_period("2024-01")
+    after = {r: _totals(app, *r) for r in ranges}
+    assert after == before
+    # J/1 was paid in March, so January alone still shows it as pending
+    assert after[(date(2024, 1, 1), date(2024, 1, 31))]["count_pending"] == 1
+
+
+def test_snapshot_is_used_only_when_the_range_covers_its_receipts(app):
+    _seed(app)
+    with app.app_context():
+        _close_period("2024-01")
+        assert _periods_covered() == ["2024-01"]
+        assert _periods_covered(date(2024, 1, 1), date(2024, 3, 31)) == ["2024-01"]
+        assert _periods_covered(date(2024, 1, 1), date(2024, 1, 31)) == []
+
+
+def test_reconciliation_api_is_unchanged_by_a_close(app, client):
+    _seed(app)
+    url = "/api/v1/reconciliation?from=2024-01-01&to=2024-01-31"
+    before = client.get(url).get_json()["data"]
+    with app.app_context():
+        _close_period("2024-01")
+    assert client.get(url).get_json()["data"] == before
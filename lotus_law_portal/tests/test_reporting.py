@@ -0,0 +1,54 @@
+import os
+import time
+
+import app as app_module
+from app import _file_lock, _snapshot_usable, refresh_reporting_snapshot
+
+
+def _use_tmp_snapshot(monkeypatch, tmp_path):
+    path = str(tmp_path / "reporting.db")
+    monkeypatch.setattr(app_module, "REPORTING_SNAPSHOT_PATH", path)
+    return path
+
+
+def test_refresh_copies_and_stamps(app, monkeypatch, tmp_path):
+    path = _use_tmp_snapshot(monkeypatch, tmp_path)
+    with app.app_context():
+        assert refresh_reporting_snapshot() is True
+        assert os.path.exists(path + ".stamp")
+        assert refresh_reporting_snapshot() is False  # fresh within the staleness bound
+
+
+def test_stale_refresh_skips_while_another_worker_holds_the_lock(app, monkeypatch, tmp_path):
+    path = _use_tmp_snapshot(monkeypatch, tmp_path)
+    monkeypatch.setattr(app_module, "REPORTING_MAX_STALENESS", 0)
+    with app.app_context():
+        refresh_reporting_snapshot()
+        stamped = os.path.getmtime(path + ".stamp")
+        with _file_lock(path + ".lock"):
+            # A stale but existing copy is served rather than copied again
+            assert refresh_reporting_snapshot() is False
+        assert os.path.getmtime(path + ".stamp") == stamped
+
+
+def test_report_after_a_write_uses_the_primary_without_copying(app, monkeypatch, tmp_path):
+    path = _use_tmp_snapshot(monkeypatch, tmp_path)
+    with app.app_context():
+        refresh_reporting_snapshot()
+    stamped = os.path.getmtime(path + ".stamp")
+    assert _snapshot_usable(last_write=stamped - 1) is True
+    assert _snapshot_usable(last_write=stamped + 1) is False
+    assert os.path.getmtime(path + ".stamp") == stamped
+
+
+def test_stale_snapshot_is_refreshed_in_the_background(app, monkeypatch, tmp_path):
+    path = _use_tmp_snapshot(monkeypatch, tmp_path)
+    with app.app_context():
+        refresh_reporting_snapshot()
+    stale = time.time() - 3600
+    os.utime(path + ".stamp", (stale, stale))
+    # The request is answered by the primary while the copy runs on another thread
+    assert _snapshot_usable(last_write=0.0) is False
+    app_module._refresh_thread.join(timeout=10)
+    assert os.path.getmtime(path + ".stamp") > stale
+    assert _snapshot_usable(last_write=0.0) is True
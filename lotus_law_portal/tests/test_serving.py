@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import app as app_module
+from app import Client
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_health_endpoints(app, client):
+    assert client.get("/healthz").get_json()["status"] == "ok"
+    assert client.get("/readyz").get_json()["status"] == "ready"
+
+
+def test_readyz_reports_an_unreachable_database(app, client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("database is gone")
+    monkeypatch.setattr(app_module.db.session, "execute", fail)
+    resp = client.get("/readyz")
+    assert resp.status_code == 503
+    assert resp.get_json()["status"] == "unavailable"
+
+
+def _import_wsgi(tmp_path, **env):
+    env = {k: v for k, v in os.environ.items() if k != "SECRET_KEY"} | env
+    env["DATABASE_URL"] = f"sqlite:///{tmp_path / 'wsgi.db'}"
+    return subprocess.run([sys.executable, "-c", "import wsgi"], cwd=APP_DIR, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+
+def test_production_entry_point_needs_secret_key(tmp_path):
+    result = _import_wsgi(tmp_path)
+    assert result.returncode != 0
+    assert "SECRET_KEY must be set" in result.stderr
+    assert _import_wsgi(tmp_path, SECRET_KEY="s3cret").returncode == 0
+
+
+def test_concurrent_writes_and_reports_do_not_fail(app):
+    # Worker threads share the pooled WAL connections: writers wait on the busy
+    # timeout instead of failing with "database is locked", readers never block
+    def work(n):
+        c = app.test_client()
+        codes = []
+        for i in range(10):
+            codes.append(c.post("/clients", data={"name": f"Client {n}-{i}"}).status_code)
+            codes.append(c.get("/dashboard").status_code)
+        return codes
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        codes = [code for result in pool.map(work, range(8)) for code in result]
+    assert all(code < 400 for code in codes)
+    with app.app_context():
+        assert Client.query.count() == 80
@@ -0,0 +1,36 @@
+# Excel workbook parsing for the importers.
+# Kept free of Flask/app imports so the per-sheet worker processes start quickly.
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    import python_calamine  # noqa: F401  optional: Rust reader, much faster than openpyxl
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = None  # pandas default (openpyxl for .xlsx, xlrd for .xls)
+
+# Starting worker processes costs about a second, so small workbooks stay in-process
+PARALLEL_MIN_BYTES = int(os.environ.get("IMPORT_PARALLEL_MIN_KB", "1024")) * 1024
+MAX_WORKERS = int(os.environ.get("IMPORT_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+def read_sheet(path: str, sheet: str, nrows: int | None = None) -> pd.DataFrame:
+    return pd.read_excel(path, sheet_name=sheet, nrows=nrows, engine=EXCEL_ENGINE)
+
+
+def read_workbook(path: str, nrows: int | None = None) -> dict[str, pd.DataFrame]:
+    # Every sheet, in workbook order. Large multi-sheet workbooks are parsed one
+    # sheet per process; "spawn" is safe inside threaded server workers.
+    with pd.ExcelFile(path, engine=EXCEL_ENGINE) as xl:
+        names = xl.sheet_names
+        workers = min(MAX_WORKERS, len(names))
+        if nrows is not None or workers < 2 or os.path.getsize(path) < PARALLEL_MIN_BYTES:
+            return {name: xl.parse(name, nrows=nrows) for name in names}
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        frames = pool.map(read_sheet, [path] * len(names), names)
+        return dict(zip(names, frames))
@@ -0,0 +1,34 @@
+# Production entry point.
+#   Linux/macOS: gunicorn -c gunicorn.conf.py wsgi:app
+#   Windows:     python wsgi.py   (waitress, multi-threaded)
+import os
+
+# The development fallback key in app.py changes on every start and differs per worker
+if not os.environ.get("SECRET_KEY"):
+    raise RuntimeError("SECRET_KEY must be set in the environment to run the production server")
+
+from app import app, start_maintenance_thread
+
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8000"))
+THREADS = int(os.environ.get("WEB_THREADS", "8"))
+# Imports and Excel exports can take minutes on large workbooks
+REQUEST_TIMEOUT = int(os.environ.get("WEB_TIMEOUT", "300"))
+
+
+def main():
+    from waitress import serve
+    start_maintenance_thread()
+    serve(
+        app,
+        host=HOST,
+        port=PORT,
+        threads=THREADS,
+        channel_timeout=REQUEST_TIMEOUT,
+        connection_limit=int(os.environ.get("WEB_CONNECTIONS", "200")),
+        max_request_body_size=app.config["MAX_CONTENT_LENGTH"],
+    )
+
+
+if __name__ == "__main__":
+    main()